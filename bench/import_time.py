@@ -0,0 +1,103 @@
+"""Importzeit der Integration und ihrer Module, jeweils in einem frischen Interpreter.
+
+Misst die Wandzeit von importlib.import_module für das Paket und die
+Sensor-Plattform und schlüsselt die Module der Integration über -X importtime
+nach kumulierter Zeit (inklusive der von ihnen geladenen Module) und Eigenzeit
+auf. Prüft außerdem, dass Export und Recorder-Statistik erst bei Bedarf
+geladen werden.
+
+Benötigt Home Assistant im Python-Pfad:
+
+    python bench/import_time.py [--repeat 5]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+PACKAGE = "custom_components.stromkosten_rechner"
+TARGETS = [PACKAGE, f"{PACKAGE}.sensor"]
+# Erst beim ersten Export bzw. bei der ersten abgeschlossenen Stunde geladen
+LAZY_MODULES = [f"{PACKAGE}.export", "homeassistant.components.recorder.statistics"]
+
+# Home Assistant vorab laden, damit nur die Integration gemessen wird; der Recorder
+# gehört bewusst nicht dazu, damit ein vorzeitiger Import in der Kumulierung sichtbar wird
+PRELOAD = (
+    "import asyncio, homeassistant.core, homeassistant.config_entries, homeassistant.helpers.event, "
+    "homeassistant.helpers.start, homeassistant.helpers.storage, homeassistant.components.sensor"
+)
+
+# Läuft im frischen Interpreter
+TIMER = PRELOAD + """
+import importlib, sys, time
+started = time.perf_counter()
+importlib.import_module({target!r})
+elapsed = time.perf_counter() - started
+print(elapsed, *(name in sys.modules for name in {lazy!r}))
+"""
+
+
+def _env() -> dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(ROOT), env.get("PYTHONPATH")]))
+    return env
+
+
+def time_import(target: str, repeat: int) -> tuple[list[float], set[str]]:
+    """Wandzeiten und die dabei vorzeitig geladenen LAZY_MODULES"""
+    timings = []
+    loaded: set[str] = set()
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-c", TIMER.format(target=target, lazy=LAZY_MODULES)],
+            capture_output=True, text=True, env=_env(), check=True,
+        )
+        elapsed, *flags = result.stdout.split()
+        timings.append(float(elapsed))
+        loaded.update(name for name, flag in zip(LAZY_MODULES, flags) if flag == "True")
+    return timings, loaded
+
+
+def module_times(target: str) -> list[tuple[int, int, str]]:
+    """(kumuliert µs, Eigenzeit µs, Modul) der Module der Integration laut -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"{PRELOAD}\nimport {target}"],
+        capture_output=True, text=True, env=_env(), check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or PACKAGE not in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        rows.append((int(cumulative_us), int(self_us), name.strip()))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    loaded: set[str] = set()
+    for target in TARGETS:
+        timings, target_loaded = time_import(target, args.repeat)
+        loaded |= target_loaded
+        print(
+            f"import {target}: median {statistics.median(timings) * 1000:.1f} ms, "
+            f"min {min(timings) * 1000:.1f} ms ({args.repeat} Läufe)"
+        )
+
+    print(f"\nModule nach kumulierter Zeit (-X importtime, import {TARGETS[-1]}):")
+    print("  kumuliert    eigen  Modul")
+    for cumulative_us, self_us, name in sorted(module_times(TARGETS[-1]), reverse=True):
+        print(f"  {cumulative_us / 1000:6.2f} ms  {self_us / 1000:5.2f} ms  {name}")
+
+    if loaded:
+        raise AssertionError(f"Beim Import vorzeitig geladen: {', '.join(sorted(loaded))}")
+    print(f"\nErst bei Bedarf geladen: {', '.join(LAZY_MODULES)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+"""Simulierte Zeit: treibt den Coordinator und die Sensoren über Tages-, Monats- und Jahresgrenzen.
+
+Prüft, dass die Energie über alle Zeiträume erhalten bleibt (Tage == Monate ==
+Abrechnungsjahre == Stundenstatistik == integrierte Energie), dass die
+Zeitumstellungstage 23 bzw. 25 Stunden haben und dass Lücken über 3600 s
+nicht integriert werden. Ein simulierter Solar-Tageszähler setzt erst um
+1 Uhr zurück und läuft über einen Neustart mit verpasstem Reset; der Ertrag
+muss ohne Doppelzählung in Tagen, Monaten und Abrechnungsjahren ankommen.
+Gibt den Durchsatz in Schritten pro Sekunde aus.
+
+Benötigt Home Assistant im Python-Pfad:
+
+    python bench/rollover.py [--days 400] [--step 30]
+"""
+import argparse
+import math
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from homeassistant.components.recorder import statistics as recorder_statistics  # noqa: E402
+from homeassistant.util import dt as dt_util  # noqa: E402
+
+from custom_components.stromkosten_rechner import sensor  # noqa: E402
+from custom_components.stromkosten_rechner import statistics  # noqa: E402
+from custom_components.stromkosten_rechner.coordinator import (  # noqa: E402
+    StromkostenCoordinator,
+    start_of_day,
+    start_of_month,
+)
+from custom_components.stromkosten_rechner.solar import (  # noqa: E402
+    SOLAR_DAY,
+    SOLAR_MONTH,
+    SOLAR_YEAR,
+    SolarYieldTracker,
+)
+
+TIME_ZONE = "Europe/Berlin"
+POWER = 1000.0  # W, konstant, damit die Tagessummen exakt vorhersagbar sind
+SOLAR_POWER = 200.0  # W, konstant, der Zähler setzt täglich um SOLAR_RESET_HOUR (Ortszeit) zurück
+SOLAR_RESET_HOUR = 1
+START = datetime(2023, 12, 30, 23, 0, tzinfo=timezone.utc)
+
+# Lücken (Start UTC, Dauer, Neustart) über Monatsende/Mitternacht, über den Beginn des Abrechnungsjahres
+# und ein Neustart, bei dem der Solar-Zähler zurückgesetzt wurde und danach über den letzten Stand stieg
+GAPS = [
+    (datetime(2024, 1, 31, 22, 30, tzinfo=timezone.utc), timedelta(hours=2), False),
+    (datetime(2024, 3, 14, 21, 0, tzinfo=timezone.utc), timedelta(hours=5), False),
+    (datetime(2024, 6, 10, 20, 0, tzinfo=timezone.utc), timedelta(hours=25, minutes=30), True),
+]
+
+# Erwartete Tagessummen (Ortszeit, kWh): Zeitumstellung mit 23 bzw. 25 Stunden und die Tage der Lücken
+SPECIAL_DAYS = {
+    "2024-01-31": 23.5,
+    "2024-02-01": 22.5,
+    "2024-03-14": 22.0,
+    "2024-03-15": 21.0,
+    "2024-03-31": 23.0,
+    "2024-06-10": 22.0,
+    "2024-06-11": 0.5,
+    "2024-10-27": 25.0,
+}
+
+CONFIG = {
+    "power_sensors": ["sensor.power"],
+    "solar_yield_day": "sensor.solar_yield_day",
+    "yearly_start_day": 15,
+    "yearly_start_month": 3,
+    "cost_per_kwh": 0.30,
+    "price_tiers": "3000: 0.40",
+    "base_fee": 10.0,
+}
+
+TOLERANCE = 1e-6
+
+
+class FakeClock:
+    def __init__(self, now: datetime):
+        self.now = now
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+def _fake_hass(config_dir: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        data={},
+        states=SimpleNamespace(get=lambda entity_id: None),
+        bus=SimpleNamespace(async_fire=lambda event_type, event_data=None: None),
+        config=SimpleNamespace(path=lambda *parts: str(Path(config_dir, *parts)), config_dir=config_dir),
+    )
+
+
+def _check(name: str, actual: float, expected: float, tolerance: float = TOLERANCE) -> None:
+    if not math.isclose(actual, expected, rel_tol=TOLERANCE, abs_tol=tolerance):
+        raise AssertionError(f"{name}: {actual} != {expected}")
+    print(f"  ok  {name}: {actual:.6f}")
+
+
+def _solar_reset(now: datetime) -> datetime:
+    """Letzter Reset des simulierten Solar-Zählers (UTC)"""
+    local = dt_util.as_local(now)
+    reset = local.replace(hour=SOLAR_RESET_HOUR, minute=0, second=0, microsecond=0)
+    if reset > local:
+        reset = (reset - timedelta(days=1)).replace(hour=SOLAR_RESET_HOUR)
+    return dt_util.as_utc(reset)
+
+
+def _solar_counter(now: datetime) -> float:
+    """Stand des simulierten Solar-Tageszählers (kWh)"""
+    return SOLAR_POWER * (now - _solar_reset(now)).total_seconds() / 3600000
+
+
+def _restart_solar(coordinator: StromkostenCoordinator) -> None:
+    """Neustart: neuer Tracker aus dem gespeicherten Stand"""
+    stored = coordinator.solar.data_to_save()
+    coordinator.solar = SolarYieldTracker(
+        coordinator.hass,
+        {SOLAR_DAY: start_of_day, SOLAR_MONTH: start_of_month, SOLAR_YEAR: coordinator.yearly_start_date},
+        coordinator._close_solar,
+    )
+    coordinator.solar.restore(stored)
+
+
+def check_solar_midnight(hass: SimpleNamespace) -> None:
+    """Anstieg nach Mitternacht im laufenden Betrieb ist ein Delta, nach einem Neustart ein Reset"""
+    tz = dt_util.get_time_zone(TIME_ZONE)
+    starts = {SOLAR_DAY: start_of_day, SOLAR_MONTH: start_of_month, SOLAR_YEAR: start_of_month}
+
+    tracker = SolarYieldTracker(hass, starts)
+    tracker.add(5.0, datetime(2024, 6, 10, 20, 0, tzinfo=tz))
+    tracker.add(5.2, datetime(2024, 6, 10, 21, 0, tzinfo=tz))
+    tracker.add(5.25, datetime(2024, 6, 11, 0, 5, tzinfo=tz))
+    _check("Solar Tag nach Mitternacht", tracker.totals[SOLAR_DAY], 0.05)
+    _check("Solar Monat nach Mitternacht", tracker.totals[SOLAR_MONTH], 5.25)
+
+    restarted = SolarYieldTracker(hass, starts)
+    restarted.restore(tracker.data_to_save())
+    restarted.add(6.0, datetime(2024, 6, 12, 14, 0, tzinfo=tz))
+    _check("Solar Tag nach Neustart mit Reset", restarted.totals[SOLAR_DAY], 6.0)
+    _check("Solar Monat nach Neustart mit Reset", restarted.totals[SOLAR_MONTH], 11.25)
+
+
+def run(days: int, step_seconds: int) -> None:
+    dt_util.set_default_time_zone(dt_util.get_time_zone(TIME_ZONE))
+    hass = _fake_hass(tempfile.mkdtemp())
+    print("Solar-Zähler:")
+    check_solar_midnight(hass)
+
+    # Langzeitstatistik abfangen statt in den Recorder zu schreiben
+    hourly_rows: list[tuple[datetime, float]] = []
+
+    def add_external_statistics(hass, metadata, rows):
+        if metadata is statistics.CONSUMPTION_METADATA:
+            hourly_rows.extend((row["start"], row["state"]) for row in rows)
+
+    recorder_statistics.async_add_external_statistics = add_external_statistics
+
+    clock = FakeClock(START)
+    coordinator = StromkostenCoordinator(hass, CONFIG, clock=clock)
+    # Stores werden nicht geschrieben
+    coordinator._schedule_save = lambda component: None
+    coordinator._last_update_time = START
+    coordinator._power_values["sensor.power"] = POWER
+
+    # Ungerundete Solar-Summen der abgeschlossenen Zeiträume; das Archiv rundet auf 4 Nachkommastellen
+    closed_solar = {SOLAR_DAY: 0.0, SOLAR_MONTH: 0.0, SOLAR_YEAR: 0.0}
+    close_solar = coordinator.archive.close_solar
+
+    def close_solar_exact(period, period_start, kwh):
+        closed_solar[period] += kwh
+        close_solar(period, period_start, kwh)
+
+    coordinator.archive.close_solar = close_solar_exact
+
+    entities = [
+        sensor.StromkostenConsumptionDaily(coordinator),
+        sensor.StromkostenConsumptionMonthly(coordinator),
+        sensor.StromkostenConsumptionYearly(coordinator),
+        sensor.StromkostenCostYearly(coordinator),
+        sensor.StromkostenConsumptionLastWeek(coordinator),
+    ]
+    for entity in entities:
+        coordinator.async_add_listener(entity._update_state)
+
+    end = START + timedelta(days=days)
+    step = timedelta(seconds=step_seconds)
+    gaps = sorted(GAPS)
+    expected_kwh = 0.0
+    # Solar: was ein fehlerfreier Tracker wissen kann (Ertrag zwischen letztem Wert und verpasstem Reset fehlt)
+    expected_solar = 0.0
+    last_sample: Optional[datetime] = None
+    last_counter = 0.0
+    steps = 0
+
+    started = time.perf_counter()
+    while clock.now < end:
+        if gaps and clock.now >= gaps[0][0]:
+            _, duration, restart = gaps.pop(0)
+            clock.now += duration
+            if restart:
+                _restart_solar(coordinator)
+        else:
+            clock.now += step
+            expected_kwh += POWER * step_seconds / 3600000
+        counter = _solar_counter(clock.now)
+        if last_sample is None or _solar_reset(clock.now) > last_sample:
+            expected_solar += counter
+        else:
+            expected_solar += counter - last_counter
+        last_sample, last_counter = clock.now, counter
+        coordinator.solar.add(counter, coordinator.now())
+        coordinator.async_update()
+        steps += 1
+    elapsed = time.perf_counter() - started
+
+    print(f"{steps} Schritte ({days} Tage à {step_seconds} s) in {elapsed:.1f} s: {steps / elapsed:,.0f} Schritte/s")
+
+    archive = coordinator.archive
+    days_kwh = sum(values[0] for values in archive.days.values()) + coordinator.daily.accumulated
+    months_kwh = sum(values[0] for values in archive.months.values()) + coordinator.monthly.accumulated
+    years_kwh = sum(values[0] for values in archive.billing_years.values()) + coordinator.yearly.accumulated
+    hours_kwh = sum(kwh for _, kwh in hourly_rows) + coordinator.statistics._hour_kwh
+
+    print("Energie:")
+    _check("Tage", days_kwh, expected_kwh)
+    _check("Monate", months_kwh, expected_kwh)
+    _check("Abrechnungsjahre", years_kwh, expected_kwh)
+    _check("Stundenstatistik", hours_kwh, expected_kwh)
+
+    print("Kosten:")
+    days_cost = sum(values[1] for values in archive.days.values()) + coordinator.daily.cost
+    months_cost = sum(values[1] for values in archive.months.values()) + coordinator.monthly.cost
+    years_cost = sum(values[1] for values in archive.billing_years.values()) + coordinator.yearly.cost
+    _check("Monate == Tage", months_cost, days_cost)
+    _check("Abrechnungsjahre == Tage", years_cost, days_cost)
+
+    print("Zeiträume:")
+    for day, hours in SPECIAL_DAYS.items():
+        if day in archive.days:
+            _check(f"Tag {day}", archive.days[day][0], hours * POWER / 1000)
+    regular = [key for key in archive.days if key not in SPECIAL_DAYS and key != min(archive.days)]
+    for key in regular:
+        if not math.isclose(archive.days[key][0], 24 * POWER / 1000):
+            raise AssertionError(f"Tag {key}: {archive.days[key][0]} != {24 * POWER / 1000}")
+    print(f"  ok  {len(regular)} reguläre Tage mit 24 h")
+    for month_key, (kwh, _cost) in sorted(archive.months.items()):
+        in_days = sum(values[0] for key, values in archive.days.items() if key.startswith(month_key))
+        _check(f"Monat {month_key} == Summe der Tage", kwh, in_days)
+    for year_start, (kwh, _cost) in sorted(archive.billing_years.items()):
+        year_end = datetime.fromisoformat(year_start).replace(year=int(year_start[:4]) + 1).date().isoformat()
+        in_days = sum(values[0] for key, values in archive.days.items() if year_start <= key < year_end)
+        _check(f"Abrechnungsjahr ab {year_start} == Summe der Tage", kwh, in_days)
+
+    print("Solar:")
+    solar = coordinator.solar
+    for name, archived, period in (
+        ("Solar Tage", archive.solar_days, SOLAR_DAY),
+        ("Solar Monate", archive.solar_months, SOLAR_MONTH),
+        ("Solar Abrechnungsjahre", archive.solar_billing_years, SOLAR_YEAR),
+    ):
+        _check(name, closed_solar[period] + solar.totals[period], expected_solar)
+        _check(f"{name} (Archiv gerundet)", sum(archived.values()), closed_solar[period], 5e-5 * len(archived))
+    # Der Ertrag zwischen dem letzten Wert vor dem Reset und dem Reset fehlt: ein Schritt pro Tag
+    solar_day = SOLAR_POWER * (24 * 3600 - step_seconds) / 3600000
+    solar_regular = [key for key in archive.solar_days if key not in SPECIAL_DAYS and key != min(archive.solar_days)]
+    for key in solar_regular:
+        if not math.isclose(archive.solar_days[key], solar_day, abs_tol=5e-5):
+            raise AssertionError(f"Solar Tag {key}: {archive.solar_days[key]} != {solar_day}")
+    print(f"  ok  {len(solar_regular)} reguläre Solar-Tage mit 24 h")
+
+    hours = [start for start, _ in hourly_rows]
+    if len(set(hours)) != len(hours):
+        raise AssertionError("Stundenstatistik enthält doppelte Stunden")
+
+    for entity in entities:
+        entity._update_state()
+    _check("Sensor Daily Consumption", entities[0].state, round(coordinator.daily.accumulated, 3))
+    print("Alle Prüfungen bestanden")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=400)
+    parser.add_argument("--step", type=int, default=30, help="Sekunden pro Integrationsschritt")
+    args = parser.parse_args()
+    run(args.days, args.step)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,58 +2,113 @@
 import logging
 from pathlib import Path
 
-from homeassistant.core import HomeAssistant
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, ServiceCall, callback
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 
-from .const import DOMAIN, CONF_POWER_SENSORS
+from .const import DOMAIN, CONF_POWER_SENSORS, REPORT_FORMAT_BOTH, REPORT_FORMATS
+from .coordinator import StromkostenCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS = [Platform.SENSOR]
 
+DATA_CARD_COPIED = f"{DOMAIN}_card_copied"
+
+SERVICE_EXPORT_REPORT = "export_report"
+ATTR_FORMAT = "format"
+
+EXPORT_REPORT_SCHEMA = vol.Schema({vol.Optional(ATTR_FORMAT, default=REPORT_FORMAT_BOTH): vol.In(REPORT_FORMATS)})
+
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Set up the Stromkosten Rechner component."""
+
+    async def _async_export_report(call: ServiceCall) -> None:
+        # Der Export wird erst beim ersten Aufruf geladen
+        from .export import async_export_report
+
+        await async_export_report(hass, hass.data.get(DOMAIN, {}), call.data[ATTR_FORMAT])
+
+    hass.services.async_register(DOMAIN, SERVICE_EXPORT_REPORT, _async_export_report, schema=EXPORT_REPORT_SCHEMA)
+    websocket_api.async_register_command(hass, websocket_load_profile)
     return True
 
 
-async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Set up Stromkosten Rechner from a config entry."""
-    hass.data.setdefault(DOMAIN, {})
-    
-    config_data = dict(entry.data)
+@websocket_api.websocket_command(
+    {vol.Required("type"): f"{DOMAIN}/load_profile", vol.Optional("entry_id"): str}
+)
+@callback
+def websocket_load_profile(hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict) -> None:
+    """Liefert das Lastprofil (Wochentag × Zeitschlitz) eines Eintrags, standardmäßig des ersten."""
+    coordinators = hass.data.get(DOMAIN, {})
+    entry_id = msg.get("entry_id") or next(iter(coordinators), None)
+    coordinator = coordinators.get(entry_id)
+    if coordinator is None:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, "Kein Stromkosten-Rechner-Eintrag gefunden")
+        return
+    connection.send_result(msg["id"], coordinator.load_profile.as_dict())
+
+
+def _get_config_data(entry: ConfigEntry) -> dict:
+    """Konfiguration aus dem Setup, überschrieben durch die Optionen."""
+    config_data = {**entry.data, **entry.options}
     power_sensors_str = config_data.get(CONF_POWER_SENSORS, "")
     
     if isinstance(power_sensors_str, str):
         power_sensors = [s.strip() for s in power_sensors_str.split("\n") if s.strip()]
         config_data[CONF_POWER_SENSORS] = power_sensors
+
+    return config_data
+
+
+def _platforms(coordinator: StromkostenCoordinator) -> list[Platform]:
+    """Plattformen des Eintrags; Alarm-Binärsensoren nur, wenn Regeln konfiguriert sind."""
+    if coordinator.alerts.rules:
+        return PLATFORMS + [Platform.BINARY_SENSOR]
+    return PLATFORMS
+
+
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Set up Stromkosten Rechner from a config entry."""
+    hass.data.setdefault(DOMAIN, {})
     
-    hass.data[DOMAIN][entry.entry_id] = config_data
+    coordinator = StromkostenCoordinator(hass, _get_config_data(entry))
+    await coordinator.async_setup()
+    hass.data[DOMAIN][entry.entry_id] = coordinator
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    await hass.config_entries.async_forward_entry_setups(entry, _platforms(coordinator))
 
-    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
     
-    await _copy_card_to_www_async(hass)
+    # Die Card-Datei muss nur einmal pro Start kopiert werden und blockiert das Setup nicht
+    if not hass.data.get(DATA_CARD_COPIED):
+        hass.data[DATA_CARD_COPIED] = True
+        hass.async_create_task(_copy_card_to_www_async(hass))
 
     return True
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    # Die Alarm-Regeln ändern sich nur per Reload, die Plattformen also auch
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, _platforms(hass.data[DOMAIN][entry.entry_id]))
 
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await coordinator.async_shutdown()
 
     return unload_ok
 
 
-async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Reload config entry."""
-    await async_unload_entry(hass, entry)
-    await async_setup_entry(hass, entry)
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Übernimmt geänderte Optionen im laufenden Betrieb, nur falls nötig per Reload."""
+    coordinator: StromkostenCoordinator = hass.data[DOMAIN][entry.entry_id]
+    if not coordinator.async_apply_config(_get_config_data(entry)):
+        await hass.config_entries.async_reload(entry.entry_id)
 
 
 async def _copy_card_to_www_async(hass: HomeAssistant) -> None:
@@ -0,0 +1,126 @@
+"""Schwellwert-Alarme über Zeitraum-Summen und Prognosen, mit Hysterese."""
+import re
+from typing import Any, Callable, Optional
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+METRIC_DAILY_KWH = "daily_kwh"
+METRIC_DAILY_COST = "daily_cost"
+METRIC_MONTHLY_KWH = "monthly_kwh"
+METRIC_MONTHLY_COST = "monthly_cost"
+METRIC_MONTHLY_COST_PROGNOSIS = "monthly_cost_prognosis"
+METRIC_YEARLY_KWH = "yearly_kwh"
+METRIC_YEARLY_COST = "yearly_cost"
+METRIC_YEARLY_KWH_PROGNOSIS = "yearly_kwh_prognosis"
+METRIC_YEARLY_COST_PROGNOSIS = "yearly_cost_prognosis"
+METRIC_BALANCE = "balance"
+METRIC_BASE_LOAD = "base_load"
+
+METRICS = [
+    METRIC_DAILY_KWH,
+    METRIC_DAILY_COST,
+    METRIC_MONTHLY_KWH,
+    METRIC_MONTHLY_COST,
+    METRIC_MONTHLY_COST_PROGNOSIS,
+    METRIC_YEARLY_KWH,
+    METRIC_YEARLY_COST,
+    METRIC_YEARLY_KWH_PROGNOSIS,
+    METRIC_YEARLY_COST_PROGNOSIS,
+    METRIC_BALANCE,
+    METRIC_BASE_LOAD,
+]
+
+_RULE_PATTERN = re.compile(r"^([a-z_]+)\s*([<>])\s*(-?[0-9]+(?:[.,][0-9]+)?)$")
+
+
+class AlertRule:
+    """Eine Regel `Größe > Schwelle` bzw. `Größe < Schwelle`.
+
+    Die Regel wird aktiv, sobald die Schwelle überschritten ist, und erst
+    wieder inaktiv, wenn die um die Hysterese verschobene Rückfallschwelle
+    erreicht ist. Beide Schwellen werden beim Anlegen berechnet.
+    """
+
+    def __init__(self, metric: str, above: bool, threshold: float, hysteresis_percent: float):
+        self.metric = metric
+        self.above = above
+        self.threshold = threshold
+        margin = abs(threshold) * hysteresis_percent / 100
+        self.off_threshold = threshold - margin if above else threshold + margin
+        self.key = f"{metric}_{'above' if above else 'below'}_{threshold:g}".replace("-", "minus_").replace(".", "_")
+        self.name = f"{metric} {'>' if above else '<'} {threshold:g}"
+        self.active = False
+
+    def check(self, value: float) -> bool:
+        """Gibt True zurück, wenn sich der Zustand der Regel geändert hat."""
+        if self.above:
+            active = value > (self.off_threshold if self.active else self.threshold)
+        else:
+            active = value < (self.off_threshold if self.active else self.threshold)
+        if active == self.active:
+            return False
+        self.active = active
+        return True
+
+
+def parse_alert_rules(value: Any, hysteresis_percent: float) -> list[AlertRule]:
+    """Liest Regeln im Format `Größe > Wert` oder `Größe < Wert` (eine pro Zeile).
+
+    Wirft ValueError bei ungültigen Zeilen oder unbekannten Größen.
+    """
+    rules: dict[str, AlertRule] = {}
+    lines = value.split("\n") if isinstance(value, str) else (value or [])
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        match = _RULE_PATTERN.match(line)
+        if not match or match.group(1) not in METRICS:
+            raise ValueError(line)
+        metric, operator, threshold = match.groups()
+        rule = AlertRule(metric, operator == ">", float(threshold.replace(",", ".")), hysteresis_percent)
+        rules[rule.key] = rule
+    return list(rules.values())
+
+
+class AlertEngine:
+    """Wertet die Regeln aus, aber nur für Größen, deren Wert sich seit der letzten Auswertung geändert hat."""
+
+    def __init__(self, hass: HomeAssistant, rules: list[AlertRule], metrics: dict[str, Callable[[], Optional[float]]]):
+        self.store = Store(hass, 1, f"{DOMAIN}_alerts")
+        self.rules = rules
+        self._metrics = metrics
+        self._rules_by_metric: dict[str, list[AlertRule]] = {}
+        for rule in rules:
+            self._rules_by_metric.setdefault(rule.metric, []).append(rule)
+        self._last_values: dict[str, Optional[float]] = {}
+
+    def restore(self, stored_data: Optional[dict[str, Any]]) -> None:
+        if not stored_data:
+            return
+        active = set(stored_data.get("active", []))
+        for rule in self.rules:
+            rule.active = rule.key in active
+
+    def data_to_save(self) -> dict[str, Any]:
+        return {"active": [rule.key for rule in self.rules if rule.active]}
+
+    def evaluate(self) -> list[AlertRule]:
+        """Gibt die Regeln zurück, deren Zustand sich geändert hat."""
+        changed = []
+        for metric, rules in self._rules_by_metric.items():
+            value = self._metrics[metric]()
+            if value is None or value == self._last_values.get(metric):
+                continue
+            self._last_values[metric] = value
+            for rule in rules:
+                if rule.check(value):
+                    changed.append(rule)
+        return changed
+
+    def value(self, metric: str) -> Optional[float]:
+        """Zuletzt ausgewerteter Wert einer Größe"""
+        return self._last_values.get(metric)
@@ -0,0 +1,79 @@
+"""Archiv abgeschlossener Tages-, Monats- und Abrechnungsjahres-Summen."""
+from datetime import date
+from typing import Any, Optional
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .solar import SOLAR_DAY, SOLAR_MONTH, SOLAR_YEAR
+
+# Einträge: [kWh, €]; Tage zusätzlich [kWh bis Tagesende im Abrechnungsjahr, € bis Tagesende]
+DAY_KWH = 0
+DAY_COST = 1
+DAY_YTD_KWH = 2
+DAY_YTD_COST = 3
+
+
+def _month_key(day: date) -> str:
+    return f"{day.year:04d}-{day.month:02d}"
+
+
+class PeriodArchive:
+    """Datumsindiziertes Archiv mit O(1)-Zugriff über ISO-Schlüssel."""
+
+    def __init__(self, hass: HomeAssistant):
+        self.store = Store(hass, 1, f"{DOMAIN}_archive")
+        self.days: dict[str, list[float]] = {}
+        self.months: dict[str, list[float]] = {}
+        self.billing_years: dict[str, list[float]] = {}
+        # Solar-Erträge (kWh), gleiche Schlüssel wie oben
+        self.solar_days: dict[str, float] = {}
+        self.solar_months: dict[str, float] = {}
+        self.solar_billing_years: dict[str, float] = {}
+
+    def restore(self, stored_data: Optional[dict[str, Any]]) -> None:
+        if not stored_data:
+            return
+        self.days = dict(stored_data.get("days", {}))
+        self.months = dict(stored_data.get("months", {}))
+        self.billing_years = dict(stored_data.get("billing_years", {}))
+        self.solar_days = dict(stored_data.get("solar_days", {}))
+        self.solar_months = dict(stored_data.get("solar_months", {}))
+        self.solar_billing_years = dict(stored_data.get("solar_billing_years", {}))
+
+    def data_to_save(self) -> dict[str, Any]:
+        return {
+            "days": self.days,
+            "months": self.months,
+            "billing_years": self.billing_years,
+            "solar_days": self.solar_days,
+            "solar_months": self.solar_months,
+            "solar_billing_years": self.solar_billing_years,
+        }
+
+    def close_day(self, day: date, kwh: float, cost: float, ytd_kwh: float, ytd_cost: float) -> None:
+        self.days[day.isoformat()] = [round(kwh, 4), round(cost, 4), round(ytd_kwh, 4), round(ytd_cost, 4)]
+
+    def close_month(self, month_start: date, kwh: float, cost: float) -> None:
+        self.months[_month_key(month_start)] = [round(kwh, 4), round(cost, 4)]
+
+    def close_billing_year(self, year_start: date, kwh: float, cost: float) -> None:
+        self.billing_years[year_start.isoformat()] = [round(kwh, 4), round(cost, 4)]
+
+    def close_solar(self, period: str, period_start: date, kwh: float) -> None:
+        if period == SOLAR_DAY:
+            self.solar_days[period_start.isoformat()] = round(kwh, 4)
+        elif period == SOLAR_MONTH:
+            self.solar_months[_month_key(period_start)] = round(kwh, 4)
+        elif period == SOLAR_YEAR:
+            self.solar_billing_years[period_start.isoformat()] = round(kwh, 4)
+
+    def day(self, day: date) -> Optional[list[float]]:
+        return self.days.get(day.isoformat())
+
+    def month(self, day: date) -> Optional[list[float]]:
+        return self.months.get(_month_key(day))
+
+    def billing_year(self, year_start: date) -> Optional[list[float]]:
+        return self.billing_years.get(year_start.isoformat())
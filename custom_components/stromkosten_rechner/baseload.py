@@ -0,0 +1,179 @@
+"""Grundlast-Erkennung (Standby) mit Streaming-Quantil-Schätzer."""
+from datetime import date, datetime
+from typing import Any, Optional
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+# Nachtfenster (Ortszeit), in dem die Grundlast geschätzt wird
+BASE_LOAD_START_HOUR = 0
+BASE_LOAD_END_HOUR = 5
+
+# Unteres Quantil der Nachtleistung; Kühlschrank & Co. heben den Median an
+BASE_LOAD_QUANTILE = 0.1
+
+# Gewicht einer neuen Nacht in der geglätteten Grundlast
+BASE_LOAD_SMOOTHING = 0.3
+
+# Nächte mit weniger Messwerten (z.B. Neustart um 4 Uhr) werden verworfen
+BASE_LOAD_MIN_SAMPLES = 100
+
+HOURS_PER_YEAR = 8760
+
+
+class P2Quantile:
+    """P²-Algorithmus (Jain & Chlamtac): ein Quantil mit fünf Markern schätzen.
+
+    Speicher und Aufwand pro Messwert sind konstant, Rohwerte werden nicht gespeichert.
+    """
+
+    def __init__(self, p: float):
+        self.p = p
+        self.count = 0
+        self._heights: list[float] = []
+        self._positions = [0.0, 1.0, 2.0, 3.0, 4.0]
+        self._desired = [0.0, 2 * p, 4 * p, 2 + 2 * p, 4.0]
+        self._increments = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+
+    def add(self, x: float) -> None:
+        self.count += 1
+        heights = self._heights
+
+        if self.count <= 5:
+            heights.append(x)
+            if self.count == 5:
+                heights.sort()
+            return
+
+        positions = self._positions
+        if x < heights[0]:
+            heights[0] = x
+            k = 0
+        elif x >= heights[4]:
+            heights[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= heights[k + 1]:
+                k += 1
+
+        for i in range(k + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+
+        # Mittlere Marker bei Bedarf um eine Position verschieben
+        for i in range(1, 4):
+            d = self._desired[i] - positions[i]
+            if (d >= 1 and positions[i + 1] - positions[i] > 1) or (d <= -1 and positions[i - 1] - positions[i] < -1):
+                step = 1 if d > 0 else -1
+                height = self._parabolic(i, step)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = heights[i] + step * (heights[i + step] - heights[i]) / (positions[i + step] - positions[i])
+                heights[i] = height
+                positions[i] += step
+
+    def _parabolic(self, i: int, step: int) -> float:
+        q, n = self._heights, self._positions
+        return q[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def value(self) -> Optional[float]:
+        if self.count == 0:
+            return None
+        if self.count < 5:
+            ordered = sorted(self._heights)
+            return ordered[int(round(self.p * (len(ordered) - 1)))]
+        return self._heights[2]
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "heights": list(self._heights),
+            "positions": list(self._positions),
+            "desired": list(self._desired),
+        }
+
+    @classmethod
+    def from_dict(cls, p: float, data: dict[str, Any]) -> "P2Quantile":
+        estimator = cls(p)
+        estimator.count = int(data["count"])
+        estimator._heights = [float(v) for v in data["heights"]]
+        if estimator.count >= 5:
+            estimator._positions = [float(v) for v in data["positions"]]
+            estimator._desired = [float(v) for v in data["desired"]]
+        return estimator
+
+
+class BaseLoadDetector:
+    """Schätzt pro Nacht die Grundlast und glättet sie über die Nächte."""
+
+    def __init__(self, hass: HomeAssistant):
+        self.store = Store(hass, 1, f"{DOMAIN}_base_load")
+        self.base_load: Optional[float] = None  # W
+        self.nights = 0
+        self._night: Optional[date] = None
+        self._estimator = P2Quantile(BASE_LOAD_QUANTILE)
+
+    @property
+    def yearly_kwh(self) -> Optional[float]:
+        if self.base_load is None:
+            return None
+        return self.base_load * HOURS_PER_YEAR / 1000
+
+    def restore(self, stored_data: Optional[dict[str, Any]]) -> None:
+        if not stored_data:
+            return
+        try:
+            base_load = stored_data.get("base_load")
+            self.base_load = float(base_load) if base_load is not None else None
+            self.nights = int(stored_data.get("nights", 0))
+            night = stored_data.get("night")
+            if night and stored_data.get("estimator"):
+                self._night = date.fromisoformat(night)
+                self._estimator = P2Quantile.from_dict(BASE_LOAD_QUANTILE, stored_data["estimator"])
+        except (ValueError, TypeError, KeyError):
+            pass
+
+    def data_to_save(self) -> dict[str, Any]:
+        return {
+            "base_load": self.base_load,
+            "nights": self.nights,
+            "night": self._night.isoformat() if self._night else None,
+            "estimator": self._estimator.as_dict() if self._night else None,
+        }
+
+    def add(self, now: datetime, total_power: float) -> bool:
+        """Nimmt einen Leistungswert (Ortszeit) auf. Gibt True zurück, wenn eine Nacht abgeschlossen wurde."""
+        in_window = BASE_LOAD_START_HOUR <= now.hour < BASE_LOAD_END_HOUR
+        night = now.date() if in_window else None
+
+        closed = False
+        if self._night is not None and night != self._night:
+            closed = self._close_night()
+
+        if in_window:
+            self._night = night
+            self._estimator.add(max(total_power, 0.0))
+
+        return closed
+
+    def _close_night(self) -> bool:
+        estimator = self._estimator
+        self._night = None
+        self._estimator = P2Quantile(BASE_LOAD_QUANTILE)
+
+        if estimator.count < BASE_LOAD_MIN_SAMPLES:
+            return False
+
+        value = estimator.value()
+        if self.base_load is None:
+            self.base_load = value
+        else:
+            self.base_load += BASE_LOAD_SMOOTHING * (value - self.base_load)
+        self.nights += 1
+        return True
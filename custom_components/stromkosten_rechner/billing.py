@@ -0,0 +1,191 @@
+"""Abrechnungs-Engine: Grundgebühr, Preisstufen, Abschläge und Prognose der Jahresabrechnung."""
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+
+DAYS_IN_YEAR = 365
+MONTHS_IN_YEAR = 12
+
+
+def parse_price_tiers(value: Any, default_price: float) -> list[tuple[float, float]]:
+    """Liest Preisstufen im Format `ab_kWh: Preis` (eine pro Zeile).
+
+    Ohne Stufe ab 0 kWh gilt darunter `default_price`. Wirft ValueError bei ungültigen Zeilen.
+    """
+    tiers: dict[float, float] = {0.0: float(default_price)}
+    lines = value.split("\n") if isinstance(value, str) else (value or [])
+    for line in lines:
+        if isinstance(line, str):
+            line = line.strip()
+            if not line:
+                continue
+            threshold, price = line.replace(",", ".").split(":")
+        else:
+            threshold, price = line
+        threshold, price = float(threshold), float(price)
+        if threshold < 0 or price < 0:
+            raise ValueError(line)
+        tiers[threshold] = price
+    return sorted(tiers.items())
+
+
+def months_started(now: datetime, period_start: datetime) -> int:
+    """Anzahl der begonnenen Abrechnungsmonate (1-12) seit `period_start`"""
+    months = (now.year - period_start.year) * 12 + now.month - period_start.month
+    if now.day >= period_start.day:
+        months += 1
+    return min(max(months, 1), MONTHS_IN_YEAR)
+
+
+class BillingEngine:
+    """Führt die Jahresabrechnung über das Abrechnungsjahr inkrementell mit.
+
+    Die Energiekosten werden pro Segment mit dem Preis der aktuellen Stufe
+    addiert; die Stufe wird nur weitergeschaltet, wenn ihre Grenze erreicht ist.
+    Kalenderabhängige Größen (Tage und begonnene Monate) werden einmal pro Tag
+    berechnet, die Prognose setzt auf dem aktuellen Stand und der aktuellen
+    Stufe auf.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        tiers: list[tuple[float, float]],
+        base_fee: float,
+        advance_payment: float,
+        period_start: Callable[[datetime], datetime],
+    ):
+        self.store = Store(hass, 1, f"{DOMAIN}_billing")
+        self.tiers = tiers
+        self.base_fee = base_fee
+        self.advance_payment = advance_payment
+        self._period_start = period_start
+
+        self.energy_kwh = 0.0
+        self.energy_cost = 0.0
+        self.last_reset: Optional[datetime] = None
+        self._tier_index = 0
+
+        self._calendar_day = None
+        self._days = 1
+        self._months = 1
+
+        self.prognosis_kwh = 0.0
+        self.cost_to_date = 0.0
+        self.payments = 0.0
+        self.expected_energy_cost = 0.0
+        self.expected_invoice = 0.0
+        self.balance = 0.0
+
+    def restore(self, stored_data: Optional[dict[str, Any]]) -> None:
+        if not stored_data:
+            return
+        try:
+            self.energy_kwh = float(stored_data.get("energy_kwh", 0.0))
+            self.energy_cost = float(stored_data.get("energy_cost", 0.0))
+            last_reset = stored_data.get("last_reset")
+            if last_reset:
+                self.last_reset = dt_util.as_local(datetime.fromisoformat(last_reset))
+        except (ValueError, TypeError):
+            pass
+        self._tier_index = self._find_tier(self.energy_kwh)
+
+    def seed(self, energy_kwh: float, last_reset: Optional[datetime]) -> None:
+        """Übernimmt den Stand des Jahreszählers, wenn noch keine Abrechnung gespeichert ist"""
+        self.energy_kwh = 0.0
+        self._tier_index = 0
+        self.energy_cost = self.add_energy(energy_kwh)
+        self.last_reset = last_reset
+
+    def update_tariff(self, tiers: list[tuple[float, float]], base_fee: float, advance_payment: float) -> None:
+        """Neuer Tarif gilt ab jetzt; bereits angefallene Energiekosten bleiben erhalten."""
+        self.tiers = tiers
+        self.base_fee = base_fee
+        self.advance_payment = advance_payment
+        self._tier_index = self._find_tier(self.energy_kwh)
+        self._calendar_day = None
+
+    def data_to_save(self) -> dict[str, Any]:
+        return {
+            "energy_kwh": self.energy_kwh,
+            "energy_cost": self.energy_cost,
+            "last_reset": self.last_reset.isoformat() if self.last_reset else None,
+        }
+
+    def add(self, start: datetime, energy_kwh: float) -> float:
+        """Addiert ein Energie-Segment und gibt dessen Kosten zurück."""
+        period_start = self._period_start(dt_util.as_local(start))
+        if self.last_reset is None or period_start > self.last_reset:
+            self.energy_kwh = 0.0
+            self.energy_cost = 0.0
+            self.last_reset = period_start
+            self._tier_index = 0
+            self._calendar_day = None
+
+        if energy_kwh <= 0:
+            return 0.0
+
+        cost = self.add_energy(energy_kwh)
+        self.energy_cost += cost
+        return cost
+
+    def add_energy(self, energy_kwh: float) -> float:
+        cost, self._tier_index = self._cost(self.energy_kwh, energy_kwh, self._tier_index)
+        self.energy_kwh += energy_kwh
+        return cost
+
+    def refresh(self, now: datetime) -> None:
+        """Aktualisiert Prognose und Abrechnungsstand (Ortszeit)"""
+        if now.date() != self._calendar_day:
+            period_start = self.last_reset or self._period_start(now)
+            self._days = max((now - period_start).days + 1, 1)
+            self._months = months_started(now, period_start)
+            self._calendar_day = now.date()
+
+        self.prognosis_kwh = self.energy_kwh / self._days * DAYS_IN_YEAR
+
+        remaining_kwh = max(self.prognosis_kwh - self.energy_kwh, 0.0)
+        remaining_cost, _ = self._cost(self.energy_kwh, remaining_kwh, self._tier_index)
+
+        self.cost_to_date = self.energy_cost + self._months * self.base_fee
+        self.payments = self._months * self.advance_payment
+        self.expected_energy_cost = self.energy_cost + remaining_cost
+        self.expected_invoice = self.expected_energy_cost + MONTHS_IN_YEAR * self.base_fee
+        # Positiv = Rückerstattung, negativ = Nachzahlung
+        self.balance = MONTHS_IN_YEAR * self.advance_payment - self.expected_invoice
+
+    @property
+    def average_price(self) -> float:
+        """Durchschnittlicher Energiepreis der Prognose (€/kWh)"""
+        if self.prognosis_kwh > 0:
+            return self.expected_energy_cost / self.prognosis_kwh
+        return self.tiers[self._tier_index][1]
+
+    def _find_tier(self, energy_kwh: float) -> int:
+        tier_index = 0
+        while tier_index + 1 < len(self.tiers) and energy_kwh >= self.tiers[tier_index + 1][0]:
+            tier_index += 1
+        return tier_index
+
+    def _cost(self, position_kwh: float, energy_kwh: float, tier_index: int) -> tuple[float, int]:
+        """Kosten von `energy_kwh` ab Zählerstand `position_kwh`, beginnend bei Stufe `tier_index`"""
+        tiers = self.tiers
+        cost = 0.0
+        while energy_kwh > 0:
+            if tier_index + 1 < len(tiers):
+                next_threshold = tiers[tier_index + 1][0]
+                if position_kwh >= next_threshold:
+                    tier_index += 1
+                    continue
+                part = min(energy_kwh, next_threshold - position_kwh)
+            else:
+                part = energy_kwh
+            cost += part * tiers[tier_index][1]
+            position_kwh += part
+            energy_kwh -= part
+        return cost, tier_index
@@ -0,0 +1,58 @@
+from typing import Any
+
+from homeassistant.components.binary_sensor import BinarySensorEntity
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN
+from .alerts import AlertRule
+from .coordinator import StromkostenCoordinator
+
+
+class StromkostenAlert(BinarySensorEntity):
+    """Zustand einer Alarm-Regel; wird nur bei Auslösen oder Zurücksetzen geschrieben."""
+
+    _attr_should_poll = False
+    _attr_icon = "mdi:alert-circle-outline"
+
+    def __init__(self, coordinator: StromkostenCoordinator, rule: AlertRule):
+        self.coordinator = coordinator
+        self.rule = rule
+        self._attr_name = f"Alert {rule.name}"
+        self._attr_unique_id = f"stromkosten_alert_{rule.key}"
+        self._written_state = None
+
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(
+            self.coordinator.async_add_listener(self._handle_coordinator_update)
+        )
+        self._written_state = self.rule.active
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        if self.rule.active == self._written_state:
+            return
+        self._written_state = self.rule.active
+        self.async_write_ha_state()
+
+    @property
+    def is_on(self) -> bool:
+        return self.rule.active
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        return {
+            "metric": self.rule.metric,
+            "threshold": self.rule.threshold,
+            "off_threshold": round(self.rule.off_threshold, 4),
+        }
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up alert binary sensors from a config entry."""
+    coordinator: StromkostenCoordinator = hass.data[DOMAIN][entry.entry_id]
+    async_add_entities(StromkostenAlert(coordinator, rule) for rule in coordinator.alerts.rules)
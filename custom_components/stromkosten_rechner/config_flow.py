@@ -3,6 +3,8 @@ from homeassistant import config_entries
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import selector
 
+from .alerts import parse_alert_rules
+from .billing import parse_price_tiers
 from .const import (
     DOMAIN,
     CONF_POWER_SENSORS,
@@ -11,15 +13,53 @@ from .const import (
     CONF_YEARLY_START_DAY,
     CONF_YEARLY_START_MONTH,
     CONF_COST_PER_KWH,
+    CONF_EXCLUDE_FROM_HISTORY,
+    CONF_LOAD_PROFILE_QUARTER_HOURS,
+    CONF_ALERT_RULES,
+    CONF_ALERT_HYSTERESIS,
+    CONF_FILTER_MIN_POWER,
+    CONF_FILTER_MAX_POWER,
+    CONF_FILTER_MAX_RATE,
+    CONF_FILTER_WINDOW,
+    CONF_BASE_FEE,
+    CONF_PRICE_TIERS,
+    CONF_ADVANCE_PAYMENT,
     DEFAULT_POWER_SENSORS,
     DEFAULT_SOLAR_POWER,
     DEFAULT_SOLAR_YIELD_DAY,
     DEFAULT_YEARLY_START_DAY,
     DEFAULT_YEARLY_START_MONTH,
     DEFAULT_COST_PER_KWH,
+    DEFAULT_EXCLUDE_FROM_HISTORY,
+    DEFAULT_LOAD_PROFILE_QUARTER_HOURS,
+    DEFAULT_ALERT_RULES,
+    DEFAULT_ALERT_HYSTERESIS,
+    DEFAULT_FILTER_MIN_POWER,
+    DEFAULT_FILTER_MAX_POWER,
+    DEFAULT_FILTER_MAX_RATE,
+    DEFAULT_FILTER_WINDOW,
+    DEFAULT_BASE_FEE,
+    DEFAULT_PRICE_TIERS,
+    DEFAULT_ADVANCE_PAYMENT,
 )
 
 
+def _valid_price_tiers(user_input) -> bool:
+    try:
+        parse_price_tiers(user_input.get(CONF_PRICE_TIERS, ""), 0)
+    except ValueError:
+        return False
+    return True
+
+
+def _valid_alert_rules(user_input) -> bool:
+    try:
+        parse_alert_rules(user_input.get(CONF_ALERT_RULES, ""), 0)
+    except ValueError:
+        return False
+    return True
+
+
 class StromkostenRechnerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
 
@@ -39,6 +79,10 @@ class StromkostenRechnerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             
             if day > days_in_month.get(month, 31):
                 errors["yearly_start_day"] = "invalid_day_for_month"
+            elif not _valid_price_tiers(user_input):
+                errors[CONF_PRICE_TIERS] = "invalid_price_tiers"
+            elif not _valid_alert_rules(user_input):
+                errors[CONF_ALERT_RULES] = "invalid_alert_rules"
             else:
                 await self.async_set_unique_id("stromkosten_rechner_main")
                 self._abort_if_unique_id_configured()
@@ -120,6 +164,115 @@ class StromkostenRechnerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                         unit_of_measurement="€/kWh"
                     )
                 ),
+                vol.Optional(
+                    CONF_BASE_FEE,
+                    default=DEFAULT_BASE_FEE
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0,
+                        max=1000,
+                        step=0.01,
+                        mode=selector.NumberSelectorMode.BOX,
+                        unit_of_measurement="€/Monat"
+                    )
+                ),
+                vol.Optional(
+                    CONF_PRICE_TIERS,
+                    default=DEFAULT_PRICE_TIERS
+                ): selector.TextSelector(
+                    selector.TextSelectorConfig(
+                        multiline=True,
+                        type=selector.TextSelectorType.TEXT
+                    )
+                ),
+                vol.Optional(
+                    CONF_ADVANCE_PAYMENT,
+                    default=DEFAULT_ADVANCE_PAYMENT
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0,
+                        max=1000,
+                        step=0.01,
+                        mode=selector.NumberSelectorMode.BOX,
+                        unit_of_measurement="€/Monat"
+                    )
+                ),
+                vol.Optional(
+                    CONF_EXCLUDE_FROM_HISTORY,
+                    default=DEFAULT_EXCLUDE_FROM_HISTORY
+                ): selector.BooleanSelector(),
+                vol.Optional(
+                    CONF_LOAD_PROFILE_QUARTER_HOURS,
+                    default=DEFAULT_LOAD_PROFILE_QUARTER_HOURS
+                ): selector.BooleanSelector(),
+                vol.Optional(
+                    CONF_ALERT_RULES,
+                    default=DEFAULT_ALERT_RULES
+                ): selector.TextSelector(
+                    selector.TextSelectorConfig(
+                        multiline=True,
+                        type=selector.TextSelectorType.TEXT
+                    )
+                ),
+                vol.Optional(
+                    CONF_ALERT_HYSTERESIS,
+                    default=DEFAULT_ALERT_HYSTERESIS
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0,
+                        max=50,
+                        step=0.5,
+                        mode=selector.NumberSelectorMode.BOX,
+                        unit_of_measurement="%"
+                    )
+                ),
+                vol.Optional(
+                    CONF_FILTER_MIN_POWER,
+                    default=DEFAULT_FILTER_MIN_POWER
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=-100000,
+                        max=0,
+                        step=1,
+                        mode=selector.NumberSelectorMode.BOX,
+                        unit_of_measurement="W"
+                    )
+                ),
+                vol.Optional(
+                    CONF_FILTER_MAX_POWER,
+                    default=DEFAULT_FILTER_MAX_POWER
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0,
+                        max=100000,
+                        step=1,
+                        mode=selector.NumberSelectorMode.BOX,
+                        unit_of_measurement="W"
+                    )
+                ),
+                vol.Optional(
+                    CONF_FILTER_MAX_RATE,
+                    default=DEFAULT_FILTER_MAX_RATE
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0,
+                        max=100000,
+                        step=1,
+                        mode=selector.NumberSelectorMode.BOX,
+                        unit_of_measurement="W/s"
+                    )
+                ),
+                vol.Optional(
+                    CONF_FILTER_WINDOW,
+                    default=DEFAULT_FILTER_WINDOW
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0,
+                        max=25,
+                        step=1,
+                        mode=selector.NumberSelectorMode.BOX
+                    )
+                ),
             }
         )
 
@@ -140,8 +293,13 @@ class StromkostenRechnerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
 
 class StromkostenRechnerOptionsFlow(config_entries.OptionsFlow):
+    def __init__(self, config_entry):
+        self._entry = config_entry
+
     async def async_step_init(self, user_input=None):
         errors = {}
+        # Aktuelle Werte: Setup-Daten, überschrieben durch bereits gespeicherte Optionen
+        config = {**self._entry.data, **self._entry.options}
         
         if user_input is not None:
             day = user_input.get(CONF_YEARLY_START_DAY, 1)
@@ -154,6 +312,10 @@ class StromkostenRechnerOptionsFlow(config_entries.OptionsFlow):
             
             if day > days_in_month.get(month, 31):
                 errors["yearly_start_day"] = "invalid_day_for_month"
+            elif not _valid_price_tiers(user_input):
+                errors[CONF_PRICE_TIERS] = "invalid_price_tiers"
+            elif not _valid_alert_rules(user_input):
+                errors[CONF_ALERT_RULES] = "invalid_alert_rules"
             else:
                 return self.async_create_entry(title="", data=user_input)
 
@@ -161,7 +323,7 @@ class StromkostenRechnerOptionsFlow(config_entries.OptionsFlow):
             {
                 vol.Required(
                     CONF_POWER_SENSORS,
-                    default=self.config_entry.data.get(
+                    default=config.get(
                         CONF_POWER_SENSORS, DEFAULT_POWER_SENSORS
                     ),
                 ): selector.TextSelector(
@@ -172,7 +334,7 @@ class StromkostenRechnerOptionsFlow(config_entries.OptionsFlow):
                 ),
                 vol.Optional(
                     CONF_SOLAR_POWER,
-                    default=self.config_entry.data.get(
+                    default=config.get(
                         CONF_SOLAR_POWER, DEFAULT_SOLAR_POWER
                     ),
                 ): selector.EntitySelector(
@@ -182,7 +344,7 @@ class StromkostenRechnerOptionsFlow(config_entries.OptionsFlow):
                 ),
                 vol.Optional(
                     CONF_SOLAR_YIELD_DAY,
-                    default=self.config_entry.data.get(
+                    default=config.get(
                         CONF_SOLAR_YIELD_DAY, DEFAULT_SOLAR_YIELD_DAY
                     ),
                 ): selector.EntitySelector(
@@ -192,7 +354,7 @@ class StromkostenRechnerOptionsFlow(config_entries.OptionsFlow):
                 ),
                 vol.Required(
                     CONF_YEARLY_START_MONTH,
-                    default=str(self.config_entry.data.get(
+                    default=str(config.get(
                         CONF_YEARLY_START_MONTH, DEFAULT_YEARLY_START_MONTH
                     )),
                 ): selector.SelectSelector(
@@ -216,7 +378,7 @@ class StromkostenRechnerOptionsFlow(config_entries.OptionsFlow):
                 ),
                 vol.Required(
                     CONF_YEARLY_START_DAY,
-                    default=self.config_entry.data.get(
+                    default=config.get(
                         CONF_YEARLY_START_DAY, DEFAULT_YEARLY_START_DAY
                     ),
                 ): selector.NumberSelector(
@@ -229,7 +391,7 @@ class StromkostenRechnerOptionsFlow(config_entries.OptionsFlow):
                 ),
                 vol.Required(
                     CONF_COST_PER_KWH,
-                    default=self.config_entry.data.get(
+                    default=config.get(
                         CONF_COST_PER_KWH, DEFAULT_COST_PER_KWH
                     ),
                 ): selector.NumberSelector(
@@ -241,6 +403,137 @@ class StromkostenRechnerOptionsFlow(config_entries.OptionsFlow):
                         unit_of_measurement="€/kWh"
                     )
                 ),
+                vol.Optional(
+                    CONF_BASE_FEE,
+                    default=config.get(
+                        CONF_BASE_FEE, DEFAULT_BASE_FEE
+                    ),
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0,
+                        max=1000,
+                        step=0.01,
+                        mode=selector.NumberSelectorMode.BOX,
+                        unit_of_measurement="€/Monat"
+                    )
+                ),
+                vol.Optional(
+                    CONF_PRICE_TIERS,
+                    default=config.get(
+                        CONF_PRICE_TIERS, DEFAULT_PRICE_TIERS
+                    ),
+                ): selector.TextSelector(
+                    selector.TextSelectorConfig(
+                        multiline=True,
+                        type=selector.TextSelectorType.TEXT
+                    )
+                ),
+                vol.Optional(
+                    CONF_ADVANCE_PAYMENT,
+                    default=config.get(
+                        CONF_ADVANCE_PAYMENT, DEFAULT_ADVANCE_PAYMENT
+                    ),
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0,
+                        max=1000,
+                        step=0.01,
+                        mode=selector.NumberSelectorMode.BOX,
+                        unit_of_measurement="€/Monat"
+                    )
+                ),
+                vol.Optional(
+                    CONF_EXCLUDE_FROM_HISTORY,
+                    default=config.get(
+                        CONF_EXCLUDE_FROM_HISTORY, DEFAULT_EXCLUDE_FROM_HISTORY
+                    ),
+                ): selector.BooleanSelector(),
+                vol.Optional(
+                    CONF_LOAD_PROFILE_QUARTER_HOURS,
+                    default=config.get(
+                        CONF_LOAD_PROFILE_QUARTER_HOURS, DEFAULT_LOAD_PROFILE_QUARTER_HOURS
+                    ),
+                ): selector.BooleanSelector(),
+                vol.Optional(
+                    CONF_ALERT_RULES,
+                    default=config.get(
+                        CONF_ALERT_RULES, DEFAULT_ALERT_RULES
+                    ),
+                ): selector.TextSelector(
+                    selector.TextSelectorConfig(
+                        multiline=True,
+                        type=selector.TextSelectorType.TEXT
+                    )
+                ),
+                vol.Optional(
+                    CONF_ALERT_HYSTERESIS,
+                    default=config.get(
+                        CONF_ALERT_HYSTERESIS, DEFAULT_ALERT_HYSTERESIS
+                    ),
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0,
+                        max=50,
+                        step=0.5,
+                        mode=selector.NumberSelectorMode.BOX,
+                        unit_of_measurement="%"
+                    )
+                ),
+                vol.Optional(
+                    CONF_FILTER_MIN_POWER,
+                    default=config.get(
+                        CONF_FILTER_MIN_POWER, DEFAULT_FILTER_MIN_POWER
+                    ),
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=-100000,
+                        max=0,
+                        step=1,
+                        mode=selector.NumberSelectorMode.BOX,
+                        unit_of_measurement="W"
+                    )
+                ),
+                vol.Optional(
+                    CONF_FILTER_MAX_POWER,
+                    default=config.get(
+                        CONF_FILTER_MAX_POWER, DEFAULT_FILTER_MAX_POWER
+                    ),
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0,
+                        max=100000,
+                        step=1,
+                        mode=selector.NumberSelectorMode.BOX,
+                        unit_of_measurement="W"
+                    )
+                ),
+                vol.Optional(
+                    CONF_FILTER_MAX_RATE,
+                    default=config.get(
+                        CONF_FILTER_MAX_RATE, DEFAULT_FILTER_MAX_RATE
+                    ),
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0,
+                        max=100000,
+                        step=1,
+                        mode=selector.NumberSelectorMode.BOX,
+                        unit_of_measurement="W/s"
+                    )
+                ),
+                vol.Optional(
+                    CONF_FILTER_WINDOW,
+                    default=config.get(
+                        CONF_FILTER_WINDOW, DEFAULT_FILTER_WINDOW
+                    ),
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0,
+                        max=25,
+                        step=1,
+                        mode=selector.NumberSelectorMode.BOX
+                    )
+                ),
             }
         )
 
@@ -9,6 +9,17 @@ CONF_SOLAR_YIELD_DAY = "solar_yield_day"
 CONF_YEARLY_START_DAY = "yearly_start_day"
 CONF_YEARLY_START_MONTH = "yearly_start_month"
 CONF_COST_PER_KWH = "cost_per_kwh"
+CONF_EXCLUDE_FROM_HISTORY = "exclude_from_history"
+CONF_FILTER_MIN_POWER = "filter_min_power"
+CONF_FILTER_MAX_POWER = "filter_max_power"
+CONF_FILTER_MAX_RATE = "filter_max_rate"
+CONF_FILTER_WINDOW = "filter_window"
+CONF_BASE_FEE = "base_fee"
+CONF_PRICE_TIERS = "price_tiers"
+CONF_ADVANCE_PAYMENT = "advance_payment"
+CONF_LOAD_PROFILE_QUARTER_HOURS = "load_profile_quarter_hours"
+CONF_ALERT_RULES = "alert_rules"
+CONF_ALERT_HYSTERESIS = "alert_hysteresis"
 
 # Default Values
 DEFAULT_POWER_SENSORS = """sensor.shellyem3_485519d9e23e_channel_a_power
@@ -19,4 +30,28 @@ DEFAULT_SOLAR_POWER = "sensor.hoymiles_hm_400_ch1_power"
 DEFAULT_SOLAR_YIELD_DAY = "sensor.hoymiles_hm_400_ch1_yieldday"
 DEFAULT_YEARLY_START_DAY = 1
 DEFAULT_YEARLY_START_MONTH = 1  # Januar
-DEFAULT_COST_PER_KWH = 0.30
\ No newline at end of file
+DEFAULT_COST_PER_KWH = 0.30
+DEFAULT_EXCLUDE_FROM_HISTORY = False
+DEFAULT_FILTER_MIN_POWER = -25000  # W pro Sensor (negativ bei Einspeisung)
+DEFAULT_FILTER_MAX_POWER = 25000  # W pro Sensor
+DEFAULT_FILTER_MAX_RATE = 0  # W/s, 0 = deaktiviert
+DEFAULT_FILTER_WINDOW = 5  # Messwerte im Hampel-Fenster, 0 = deaktiviert
+DEFAULT_BASE_FEE = 0.0  # €/Monat
+DEFAULT_PRICE_TIERS = ""  # "ab_kWh: Preis" pro Zeile
+DEFAULT_ADVANCE_PAYMENT = 0.0  # €/Monat (Abschlag)
+DEFAULT_LOAD_PROFILE_QUARTER_HOURS = False  # Lastprofil stündlich statt viertelstündlich
+DEFAULT_ALERT_RULES = ""  # "Größe > Wert" pro Zeile
+DEFAULT_ALERT_HYSTERESIS = 5.0  # % der Schwelle
+
+# Langzeitstatistik (Recorder)
+STATISTIC_CONSUMPTION = f"{DOMAIN}:energy_consumption"
+STATISTIC_COST = f"{DOMAIN}:energy_cost"
+
+# Formate des Dienstes export_report
+REPORT_FORMAT_CSV = "csv"
+REPORT_FORMAT_JSON = "json"
+REPORT_FORMAT_BOTH = "both"
+REPORT_FORMATS = [REPORT_FORMAT_CSV, REPORT_FORMAT_JSON, REPORT_FORMAT_BOTH]
+
+# Wird beim Auslösen und Zurücksetzen eines Alarms gefeuert
+EVENT_ALERT = f"{DOMAIN}_alert"
@@ -0,0 +1,640 @@
+"""Coordinator: zentrale Energie-Integration für den Stromkosten Rechner."""
+import asyncio
+import calendar
+import logging
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Any, Callable, Optional
+
+from homeassistant.const import STATE_UNKNOWN, STATE_UNAVAILABLE, UnitOfEnergy, UnitOfPower
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_state_change_event, async_track_time_interval
+from homeassistant.helpers.start import async_at_started
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    CONF_POWER_SENSORS,
+    CONF_SOLAR_YIELD_DAY,
+    CONF_YEARLY_START_DAY,
+    CONF_YEARLY_START_MONTH,
+    CONF_COST_PER_KWH,
+    CONF_EXCLUDE_FROM_HISTORY,
+    CONF_FILTER_MIN_POWER,
+    CONF_FILTER_MAX_POWER,
+    CONF_FILTER_MAX_RATE,
+    CONF_FILTER_WINDOW,
+    CONF_BASE_FEE,
+    CONF_PRICE_TIERS,
+    CONF_ADVANCE_PAYMENT,
+    CONF_LOAD_PROFILE_QUARTER_HOURS,
+    CONF_ALERT_RULES,
+    CONF_ALERT_HYSTERESIS,
+    DEFAULT_YEARLY_START_DAY,
+    DEFAULT_YEARLY_START_MONTH,
+    DEFAULT_COST_PER_KWH,
+    DEFAULT_EXCLUDE_FROM_HISTORY,
+    DEFAULT_FILTER_MIN_POWER,
+    DEFAULT_FILTER_MAX_POWER,
+    DEFAULT_FILTER_MAX_RATE,
+    DEFAULT_FILTER_WINDOW,
+    DEFAULT_BASE_FEE,
+    DEFAULT_PRICE_TIERS,
+    DEFAULT_ADVANCE_PAYMENT,
+    DEFAULT_LOAD_PROFILE_QUARTER_HOURS,
+    DEFAULT_ALERT_RULES,
+    DEFAULT_ALERT_HYSTERESIS,
+    EVENT_ALERT,
+)
+from .alerts import (
+    METRIC_BALANCE,
+    METRIC_BASE_LOAD,
+    METRIC_DAILY_COST,
+    METRIC_DAILY_KWH,
+    METRIC_MONTHLY_COST,
+    METRIC_MONTHLY_COST_PROGNOSIS,
+    METRIC_MONTHLY_KWH,
+    METRIC_YEARLY_COST,
+    METRIC_YEARLY_COST_PROGNOSIS,
+    METRIC_YEARLY_KWH,
+    METRIC_YEARLY_KWH_PROGNOSIS,
+    AlertEngine,
+    parse_alert_rules,
+)
+from .archive import PeriodArchive
+from .baseload import BaseLoadDetector
+from .billing import BillingEngine, parse_price_tiers
+from .filters import PowerFilter
+from .profile import LoadProfile
+from .solar import SOLAR_DAY, SOLAR_MONTH, SOLAR_YEAR, SolarYieldTracker
+from .statistics import HourlyStatistics
+from .units import ENERGY_FACTORS, POWER_FACTORS, UnitNormalizer
+
+_LOGGER = logging.getLogger(__name__)
+
+# Update-Intervall für kontinuierliche Berechnung
+UPDATE_INTERVAL = timedelta(seconds=10)
+
+# Größere Lücken (z.B. nach einem Neustart) werden nicht integriert
+MAX_TIME_DELTA = 3600
+
+# Verzögerung, mit der geänderte Stores gesammelt geschrieben werden (Sekunden)
+SAVE_DELAY = 30
+
+HOUR = timedelta(hours=1)
+
+
+def get_yearly_start_date(now: datetime, yearly_start_day: int, yearly_start_month: int) -> datetime:
+    """Berechnet das Startdatum des Abrechnungsjahres, in dem `now` liegt"""
+    try:
+        start_date = now.replace(month=yearly_start_month, day=yearly_start_day, hour=0, minute=0, second=0, microsecond=0)
+
+        # Wenn in der Zukunft, nutze letztes Jahr
+        if start_date > now:
+            start_date = start_date.replace(year=now.year - 1)
+
+        return start_date
+    except ValueError:
+        # Fallback bei ungültigem Datum
+        return now.replace(month=yearly_start_month, day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def start_of_day(now: datetime) -> datetime:
+    return now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def start_of_month(now: datetime) -> datetime:
+    return now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def parse_local_datetime(value: str) -> datetime:
+    """Liest einen gespeicherten Zeitstempel; ältere Stores enthalten naive Ortszeit."""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+    return dt_util.as_local(parsed)
+
+
+class PeriodAccumulator:
+    """Summiert Energie und Kosten über einen Zeitraum, der beim Wechsel von `period_start` zurückgesetzt wird.
+
+    `on_close` erhält vor dem Reset Start, Energie und Kosten des abgeschlossenen Zeitraums.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        key: str,
+        period_start: Callable[[datetime], datetime],
+        on_close: Optional[Callable[[datetime, float, float], None]] = None,
+    ):
+        self.store = Store(hass, 1, f"{DOMAIN}_{key}")
+        self._period_start = period_start
+        self._on_close = on_close
+        self.accumulated = 0.0
+        self.cost = 0.0
+        self.last_reset: Optional[datetime] = None
+
+    def restore(self, stored_data: Optional[dict[str, Any]]) -> None:
+        if not stored_data:
+            return
+        try:
+            self.accumulated = float(stored_data.get("accumulated", 0.0))
+            self.cost = float(stored_data.get("cost", 0.0))
+            last_reset = stored_data.get("last_reset")
+            if last_reset:
+                self.last_reset = parse_local_datetime(last_reset)
+        except (ValueError, TypeError):
+            pass
+
+    def data_to_save(self) -> dict[str, Any]:
+        return {
+            "accumulated": self.accumulated,
+            "cost": self.cost,
+            "last_reset": self.last_reset.isoformat() if self.last_reset else None,
+        }
+
+    def add(self, start: datetime, energy_kwh: float, cost: float = 0.0) -> bool:
+        """Addiert ein Energie-Segment. Gibt True zurück, wenn sich etwas geändert hat."""
+        period_start = self._period_start(dt_util.as_local(start))
+        changed = False
+
+        # Reset bei neuem Zeitraum
+        if self.last_reset is None or period_start > self.last_reset:
+            if self.last_reset is not None and self._on_close is not None:
+                self._on_close(self.last_reset, self.accumulated, self.cost)
+            self.accumulated = 0.0
+            self.cost = 0.0
+            self.last_reset = period_start
+            changed = True
+
+        if energy_kwh > 0:
+            self.accumulated += energy_kwh
+            self.cost += cost
+            changed = True
+
+        return changed
+
+
+def _alert_settings(config_data: dict[str, Any]) -> tuple[str, float]:
+    return (
+        config_data.get(CONF_ALERT_RULES, DEFAULT_ALERT_RULES) or "",
+        float(config_data.get(CONF_ALERT_HYSTERESIS, DEFAULT_ALERT_HYSTERESIS)),
+    )
+
+
+def _filter_settings(config_data: dict[str, Any]) -> tuple[float, float, float, int]:
+    return (
+        float(config_data.get(CONF_FILTER_MIN_POWER, DEFAULT_FILTER_MIN_POWER)),
+        float(config_data.get(CONF_FILTER_MAX_POWER, DEFAULT_FILTER_MAX_POWER)),
+        float(config_data.get(CONF_FILTER_MAX_RATE, DEFAULT_FILTER_MAX_RATE)),
+        int(config_data.get(CONF_FILTER_WINDOW, DEFAULT_FILTER_WINDOW)),
+    )
+
+
+class StromkostenCoordinator:
+    """Liest die Leistungssensoren einmal pro Schritt und verteilt die Energie auf alle Zeiträume.
+
+    Jeder Schritt wird an Stundengrenzen (UTC) aufgeteilt, sodass Tages-,
+    Monats-, Jahres- und Stundensummen exakt zueinander passen.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config_data: dict[str, Any],
+        clock: Callable[[], datetime] = dt_util.utcnow,
+    ):
+        self.hass = hass
+        # Liefert die aktuelle Zeit (UTC); austauschbar, um Zeiträume in simulierter Zeit zu durchlaufen
+        self._clock = clock
+        self.power_sensors: list[str] = config_data.get(CONF_POWER_SENSORS, [])
+        self.solar_yield_day: Optional[str] = config_data.get(CONF_SOLAR_YIELD_DAY)
+        self.yearly_start_day = int(config_data.get(CONF_YEARLY_START_DAY, DEFAULT_YEARLY_START_DAY))
+        self.yearly_start_month = int(config_data.get(CONF_YEARLY_START_MONTH, DEFAULT_YEARLY_START_MONTH))
+        self.cost_per_kwh = float(config_data.get(CONF_COST_PER_KWH, DEFAULT_COST_PER_KWH))
+        self.exclude_from_history = bool(config_data.get(CONF_EXCLUDE_FROM_HISTORY, DEFAULT_EXCLUDE_FROM_HISTORY))
+        self.load_profile_quarter_hours = bool(
+            config_data.get(CONF_LOAD_PROFILE_QUARTER_HOURS, DEFAULT_LOAD_PROFILE_QUARTER_HOURS)
+        )
+
+        self.archive = PeriodArchive(hass)
+        self.daily = PeriodAccumulator(hass, "daily_consumption", start_of_day, self._close_day)
+        self.monthly = PeriodAccumulator(hass, "monthly_consumption", start_of_month, self._close_month)
+        self.yearly = PeriodAccumulator(hass, "yearly_consumption", self.yearly_start_date, self._close_billing_year)
+        self.statistics = HourlyStatistics(hass)
+        self.base_load = BaseLoadDetector(hass)
+        self.load_profile = LoadProfile(hass, 4 if self.load_profile_quarter_hours else 1, self.yearly_start_date)
+        self._alert_settings = _alert_settings(config_data)
+        self.alerts = AlertEngine(
+            hass,
+            parse_alert_rules(*self._alert_settings),
+            {
+                METRIC_DAILY_KWH: lambda: self.daily.accumulated,
+                METRIC_DAILY_COST: lambda: self.daily.cost,
+                METRIC_MONTHLY_KWH: lambda: self.monthly.accumulated,
+                METRIC_MONTHLY_COST: lambda: self.monthly.cost,
+                METRIC_MONTHLY_COST_PROGNOSIS: self._monthly_cost_prognosis,
+                METRIC_YEARLY_KWH: lambda: self.yearly.accumulated,
+                METRIC_YEARLY_COST: lambda: self.billing.cost_to_date,
+                METRIC_YEARLY_KWH_PROGNOSIS: lambda: self.billing.prognosis_kwh,
+                METRIC_YEARLY_COST_PROGNOSIS: lambda: self.billing.expected_invoice,
+                METRIC_BALANCE: lambda: self.billing.balance,
+                METRIC_BASE_LOAD: lambda: self.base_load.base_load,
+            },
+        )
+        self.solar = SolarYieldTracker(
+            hass,
+            {SOLAR_DAY: start_of_day, SOLAR_MONTH: start_of_month, SOLAR_YEAR: self.yearly_start_date},
+            self._close_solar,
+        )
+        self.solar_units = UnitNormalizer(ENERGY_FACTORS, UnitOfEnergy.KILO_WATT_HOUR)
+        self.billing = BillingEngine(
+            hass,
+            parse_price_tiers(config_data.get(CONF_PRICE_TIERS, DEFAULT_PRICE_TIERS), self.cost_per_kwh),
+            float(config_data.get(CONF_BASE_FEE, DEFAULT_BASE_FEE)),
+            float(config_data.get(CONF_ADVANCE_PAYMENT, DEFAULT_ADVANCE_PAYMENT)),
+            self.yearly_start_date,
+        )
+
+        # Pro Sensor ein Filter, eine Subscription und der zuletzt akzeptierte Wert (W)
+        self._filter_settings = _filter_settings(config_data)
+        self.filters: dict[str, PowerFilter] = {}
+        self._power_values: dict[str, float] = {}
+        self._sensor_unsub: dict[str, CALLBACK_TYPE] = {}
+        self.power_units = UnitNormalizer(POWER_FACTORS, UnitOfPower.WATT)
+
+        self._started = False
+        self._last_update_time: Optional[datetime] = None
+        self._listeners: list[CALLBACK_TYPE] = []
+        self._unsub: list[CALLBACK_TYPE] = []
+        self._dirty: set[Any] = set()
+
+    @property
+    def _persistent(self) -> tuple:
+        return (
+            self.daily, self.monthly, self.yearly, self.statistics, self.billing, self.base_load, self.archive,
+            self.solar, self.load_profile, self.alerts,
+        )
+
+    def utcnow(self) -> datetime:
+        return self._clock()
+
+    def now(self) -> datetime:
+        """Aktuelle Ortszeit"""
+        return dt_util.as_local(self._clock())
+
+    def yearly_start_date(self, now: datetime) -> datetime:
+        return get_yearly_start_date(now, self.yearly_start_day, self.yearly_start_month)
+
+    async def async_setup(self) -> None:
+        """Stellt alle gespeicherten Summen wieder her, bevor Entities angelegt werden.
+
+        Alle Stores des Eintrags werden gleichzeitig geladen. Die Integration
+        selbst startet erst, wenn Home Assistant vollständig gestartet ist und
+        die Eingangssensoren ihre Zustände haben.
+        """
+        stored = await asyncio.gather(*(component.store.async_load() for component in self._persistent))
+        for component, stored_data in zip(self._persistent, stored):
+            component.restore(stored_data)
+
+        if self.billing.last_reset is None:
+            self.billing.seed(self.yearly.accumulated, self.yearly.last_reset)
+        if not self.yearly.cost and self.billing.last_reset == self.yearly.last_reset:
+            self.yearly.cost = self.billing.energy_cost
+
+        self.billing.refresh(self.now())
+
+        self._unsub.append(async_at_started(self.hass, self._async_start))
+
+    @callback
+    def _async_start(self, _hass: HomeAssistant) -> None:
+        """Startet die Integration der Leistungssensoren und des Solar-Zählers."""
+        self._started = True
+        self._last_update_time = self.utcnow()
+
+        for sensor_id in self.power_sensors:
+            self._add_power_sensor(sensor_id, self._last_update_time)
+
+        if self.solar_yield_day:
+            self._update_solar_value(self.hass.states.get(self.solar_yield_day))
+            self._unsub.append(
+                async_track_state_change_event(
+                    self.hass,
+                    self.solar_yield_day,
+                    self._async_solar_changed
+                )
+            )
+
+        # Periodischer Update alle 10 Sekunden (auch wenn sich nichts ändert)
+        self._unsub.append(
+            async_track_time_interval(
+                self.hass,
+                self._async_periodic_update,
+                UPDATE_INTERVAL
+            )
+        )
+
+    async def async_shutdown(self) -> None:
+        """Beendet die Integration und schreibt alle Stores sofort."""
+        for unsub in self._unsub:
+            unsub()
+        self._unsub.clear()
+        self._started = False
+        for sensor_id in list(self._sensor_unsub):
+            self._remove_power_sensor(sensor_id)
+
+        for component in self._persistent:
+            await component.store.async_save(component.data_to_save())
+        self._dirty.clear()
+
+    @callback
+    def async_apply_config(self, config_data: dict[str, Any]) -> bool:
+        """Übernimmt geänderte Optionen ohne die Entities neu anzulegen.
+
+        Das laufende Intervall wird vorher mit den alten Einstellungen
+        abgeschlossen, neue Preise gelten also ab jetzt. Gibt False zurück,
+        wenn eine Änderung nur durch Neuladen des Eintrags übernommen werden kann.
+        """
+        if (
+            config_data.get(CONF_SOLAR_YIELD_DAY) != self.solar_yield_day
+            or bool(config_data.get(CONF_EXCLUDE_FROM_HISTORY, DEFAULT_EXCLUDE_FROM_HISTORY)) != self.exclude_from_history
+            or bool(config_data.get(CONF_LOAD_PROFILE_QUARTER_HOURS, DEFAULT_LOAD_PROFILE_QUARTER_HOURS))
+            != self.load_profile_quarter_hours
+            or _alert_settings(config_data) != self._alert_settings
+        ):
+            return False
+
+        # Vor dem Start gibt es kein laufendes Intervall
+        if self._started:
+            self.async_update()
+
+        # Tarif ab jetzt
+        self.cost_per_kwh = float(config_data.get(CONF_COST_PER_KWH, DEFAULT_COST_PER_KWH))
+        self.billing.update_tariff(
+            parse_price_tiers(config_data.get(CONF_PRICE_TIERS, DEFAULT_PRICE_TIERS), self.cost_per_kwh),
+            float(config_data.get(CONF_BASE_FEE, DEFAULT_BASE_FEE)),
+            float(config_data.get(CONF_ADVANCE_PAYMENT, DEFAULT_ADVANCE_PAYMENT)),
+        )
+
+        # Ein neuer Ablesetermin wird beim nächsten Schritt über die Zeitraum-Funktion wirksam
+        self.yearly_start_day = int(config_data.get(CONF_YEARLY_START_DAY, DEFAULT_YEARLY_START_DAY))
+        self.yearly_start_month = int(config_data.get(CONF_YEARLY_START_MONTH, DEFAULT_YEARLY_START_MONTH))
+
+        filter_settings = _filter_settings(config_data)
+        if filter_settings != self._filter_settings:
+            self._filter_settings = filter_settings
+            for power_filter in self.filters.values():
+                power_filter.configure(*filter_settings)
+
+        # Nur geänderte Sensoren an- bzw. abmelden (vor dem Start übernimmt das _async_start)
+        power_sensors = config_data.get(CONF_POWER_SENSORS, [])
+        for sensor_id in set(self.power_sensors) - set(power_sensors):
+            self._remove_power_sensor(sensor_id)
+        if self._started:
+            for sensor_id in power_sensors:
+                self._add_power_sensor(sensor_id, self._last_update_time)
+        self.power_sensors = power_sensors
+
+        self.billing.refresh(self.now())
+        self._async_notify_listeners()
+        return True
+
+    def _add_power_sensor(self, sensor_id: str, now: datetime) -> None:
+        if sensor_id in self._sensor_unsub:
+            return
+        self.filters[sensor_id] = PowerFilter(*self._filter_settings)
+        self._update_power_value(sensor_id, self.hass.states.get(sensor_id), now)
+        self._sensor_unsub[sensor_id] = async_track_state_change_event(
+            self.hass,
+            sensor_id,
+            self._async_power_changed
+        )
+
+    def _remove_power_sensor(self, sensor_id: str) -> None:
+        unsub = self._sensor_unsub.pop(sensor_id, None)
+        if unsub:
+            unsub()
+        self.filters.pop(sensor_id, None)
+        self._power_values.pop(sensor_id, None)
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> Callable[[], None]:
+        """Registriert einen Callback, der nach jedem Integrationsschritt aufgerufen wird."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def _async_notify_listeners(self) -> None:
+        self._evaluate_alerts()
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    def _evaluate_alerts(self) -> None:
+        """Feuert für jede Regel, die ausgelöst oder zurückgesetzt wurde, ein Event."""
+        changed = self.alerts.evaluate()
+        for rule in changed:
+            self.hass.bus.async_fire(
+                EVENT_ALERT,
+                {
+                    "rule": rule.name,
+                    "metric": rule.metric,
+                    "value": self.alerts.value(rule.metric),
+                    "threshold": rule.threshold,
+                    "active": rule.active,
+                },
+            )
+        if changed:
+            self._schedule_save(self.alerts)
+
+    def _monthly_cost_prognosis(self) -> Optional[float]:
+        """Hochrechnung der Monatskosten (Energie + Grundgebühr); ab dem zweiten Tag aussagekräftig"""
+        month_start = self.monthly.last_reset
+        if month_start is None:
+            return None
+        days_in_month = calendar.monthrange(month_start.year, month_start.month)[1]
+        elapsed_days = max((self.now() - month_start).total_seconds() / 86400, 1.0)
+        return self.monthly.cost / min(elapsed_days, days_in_month) * days_in_month + self.billing.base_fee
+
+    @property
+    def rejected_samples(self) -> int:
+        return sum(power_filter.rejected_total for power_filter in self.filters.values())
+
+    @callback
+    def _async_power_changed(self, event) -> None:
+        """Wird aufgerufen, wenn sich ein Power-Sensor ändert"""
+        self._update_power_value(event.data["entity_id"], event.data.get("new_state"), self.utcnow())
+        self.async_update()
+
+    def _update_power_value(self, sensor_id: str, state, now: datetime, resample: bool = False) -> None:
+        """Übernimmt einen neuen Messwert, sofern er den Filter passiert"""
+        if not state or state.state in (STATE_UNKNOWN, None, STATE_UNAVAILABLE):
+            self._drop_power_value(sensor_id)
+            return
+
+        factor = self.power_units.factor(state)
+        if factor is None:
+            self._drop_power_value(sensor_id)
+            return
+
+        try:
+            value = float(state.state) * factor
+        except ValueError:
+            self._drop_power_value(sensor_id)
+            return
+
+        # Verworfene Werte: der letzte akzeptierte Wert bleibt gültig
+        power_filter = self.filters[sensor_id]
+        if resample:
+            accepted = power_filter.recheck(value, state.last_changed, now)
+        else:
+            accepted = power_filter.check(value, now)
+        if accepted:
+            self._power_values[sensor_id] = value
+        elif not resample:
+            _LOGGER.debug("Messwert von %s verworfen: %s W", sensor_id, value)
+
+    def _drop_power_value(self, sensor_id: str) -> None:
+        """Sensor liefert keinen gültigen Wert: er zählt nicht mehr mit und wird nicht erneut geprüft"""
+        self.filters[sensor_id].pending = None
+        self._power_values.pop(sensor_id, None)
+
+    @callback
+    def _async_solar_changed(self, event) -> None:
+        """Wird aufgerufen, wenn sich der Solar-Tagesertrag ändert"""
+        if self._update_solar_value(event.data.get("new_state")):
+            self._async_notify_listeners()
+
+    def _update_solar_value(self, state) -> bool:
+        """Übernimmt einen Zählerstand des Solar-Tagesertrags. Gibt True zurück, wenn sich eine Summe geändert hat."""
+        if not state or state.state in (STATE_UNKNOWN, None, STATE_UNAVAILABLE):
+            return False
+
+        factor = self.solar_units.factor(state)
+        if factor is None:
+            return False
+
+        try:
+            value = float(state.state) * factor
+        except ValueError:
+            return False
+
+        if not self.solar.add(value, self.now()):
+            return False
+        self._schedule_save(self.solar)
+        return True
+
+    @callback
+    def _async_periodic_update(self, now: datetime) -> None:
+        """Periodisches Update alle 10 Sekunden"""
+        # Zuletzt verworfene Werte erneut prüfen: ein flacher Sensor meldet keine neuen Zustände
+        now = self.utcnow()
+        for sensor_id, power_filter in self.filters.items():
+            if power_filter.pending is not None:
+                self._update_power_value(sensor_id, self.hass.states.get(sensor_id), now, resample=True)
+            else:
+                # Änderungsrate neuer Werte gegen diesen Zeitpunkt messen, nicht gegen den letzten Zustandswechsel
+                power_filter.hold(now)
+
+        # Grundlast nur im festen Takt abtasten, damit jede Stichprobe gleich viel Zeit vertritt;
+        # Zustandswechsel eines schwankenden Verbrauchers würden das Quantil sonst nach oben ziehen
+        if self.base_load.add(dt_util.as_local(now), self._read_total_power()):
+            self._schedule_save(self.base_load)
+        self.async_update()
+
+    @callback
+    def async_update(self) -> None:
+        """Integriert die aktuelle Leistung seit dem letzten Schritt."""
+        now = self.utcnow()
+        last_update = self._last_update_time
+        self._last_update_time = now
+
+        if last_update is None:
+            return
+
+        time_delta = (now - last_update).total_seconds()
+
+        # Verhindere negative oder zu große Zeitdifferenzen, Zeiträume aber trotzdem weiterschalten
+        if time_delta <= 0 or time_delta > MAX_TIME_DELTA:
+            self._distribute(now, 0.0)
+            self.billing.refresh(dt_util.as_local(now))
+            self._async_notify_listeners()
+            return
+
+        total_power = self._read_total_power()
+
+        # Berechne Energie: Power (W) * Zeit (s) / 3600 / 1000 = kWh
+        # Der Schritt wird an Stundengrenzen geteilt, damit jede Stunde exakt abgerechnet wird
+        start = last_update
+        while start < now:
+            end = min(now, start.replace(minute=0, second=0, microsecond=0) + HOUR)
+            energy_kwh = 0.0
+            if total_power > 0:
+                energy_kwh = (total_power * (end - start).total_seconds()) / 3600000
+            self._distribute(start, energy_kwh)
+            start = end
+
+        local_now = dt_util.as_local(now)
+        # Solar-Zeiträume auch ohne neuen Zählerstand weiterschalten
+        if self.solar_yield_day and self.solar.roll(local_now):
+            self._schedule_save(self.solar)
+
+        self.billing.refresh(local_now)
+        self._async_notify_listeners()
+
+    def _read_total_power(self) -> float:
+        """Summiert die zuletzt akzeptierte Leistung aller Sensoren (W)"""
+        return sum(self._power_values.values())
+
+    def _distribute(self, start: datetime, energy_kwh: float) -> None:
+        """Verteilt ein Energie-Segment auf alle Zeiträume und die Stundenstatistik."""
+        cost = self.billing.add(start, energy_kwh)
+
+        # Tag und Monat zuerst: beim Abschluss eines Tages steht der Jahreszähler noch auf dessen Ende
+        for accumulator in (self.daily, self.monthly):
+            if accumulator.add(start, energy_kwh, cost):
+                self._schedule_save(accumulator)
+
+        # Abrechnungsjahr = Zeitraum des Jahreszählers
+        if self.yearly.add(start, energy_kwh, cost):
+            self._schedule_save(self.yearly)
+            self._schedule_save(self.billing)
+
+        if self.statistics.add(start, energy_kwh, cost):
+            self._schedule_save(self.statistics)
+
+        if self.load_profile.add(start, energy_kwh, cost):
+            self._schedule_save(self.load_profile)
+
+    def _close_day(self, period_start: datetime, energy_kwh: float, cost: float) -> None:
+        self.archive.close_day(period_start.date(), energy_kwh, cost, self.yearly.accumulated, self.yearly.cost)
+        self._schedule_save(self.archive)
+
+    def _close_month(self, period_start: datetime, energy_kwh: float, cost: float) -> None:
+        self.archive.close_month(period_start.date(), energy_kwh, cost)
+        self._schedule_save(self.archive)
+
+    def _close_billing_year(self, period_start: datetime, energy_kwh: float, cost: float) -> None:
+        self.archive.close_billing_year(period_start.date(), energy_kwh, cost)
+        self._schedule_save(self.archive)
+
+    def _close_solar(self, period: str, period_start: datetime, energy_kwh: float) -> None:
+        self.archive.close_solar(period, period_start.date(), energy_kwh)
+        self._schedule_save(self.archive)
+
+    def _schedule_save(self, component: Any) -> None:
+        """Fasst Schreibzugriffe zusammen: pro Store höchstens ein ausstehender Save."""
+        if component in self._dirty:
+            return
+        self._dirty.add(component)
+        component.store.async_delay_save(partial(self._data_to_save, component), SAVE_DELAY)
+
+    def _data_to_save(self, component: Any) -> dict[str, Any]:
+        self._dirty.discard(component)
+        return component.data_to_save()
@@ -0,0 +1,121 @@
+"""Export der archivierten Summen als CSV- und JSON-Report."""
+import csv
+import json
+import logging
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, REPORT_FORMAT_BOTH, REPORT_FORMAT_CSV, REPORT_FORMAT_JSON
+from .solar import SOLAR_DAY, SOLAR_MONTH, SOLAR_YEAR
+
+_LOGGER = logging.getLogger(__name__)
+
+DAY_COLUMNS = ["date", "consumption_kwh", "cost_eur", "billing_year_to_date_kwh", "billing_year_to_date_eur", "complete"]
+MONTH_COLUMNS = ["month", "consumption_kwh", "cost_eur", "complete"]
+BILLING_YEAR_COLUMNS = ["start", "consumption_kwh", "cost_eur", "complete"]
+SOLAR_DAY_COLUMNS = ["date", "solar_kwh", "complete"]
+SOLAR_MONTH_COLUMNS = ["month", "solar_kwh", "complete"]
+SOLAR_BILLING_YEAR_COLUMNS = ["start", "solar_kwh", "complete"]
+
+
+def _rows(archived: dict[str, Any], current: list[Any]) -> Iterator[list[Any]]:
+    """Archivierte Zeilen in Datumsreihenfolge, gefolgt vom laufenden Zeitraum"""
+    for key in sorted(archived):
+        values = archived[key]
+        if isinstance(values, list):
+            yield [key, *values, True]
+        else:
+            yield [key, values, True]
+    if current:
+        yield [*current, False]
+
+
+def _write_csv(path: Path, columns: list[str], rows: Iterable[list[Any]]) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(row)
+
+
+def _write_json(path: Path, columns: list[str], rows: Iterable[list[Any]]) -> None:
+    """Schreibt ein JSON-Array Zeile für Zeile, ohne den Report im Speicher aufzubauen"""
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("[")
+        for index, row in enumerate(rows):
+            if index:
+                file.write(",")
+            file.write("\n")
+            json.dump(dict(zip(columns, row)), file)
+        file.write("\n]\n")
+
+
+def write_report(directory: Path, prefix: str, tables: dict[str, tuple[list[str], dict, list]], report_format: str) -> list[Path]:
+    """Schreibt alle Tabellen eines Eintrags (läuft im Executor)"""
+    directory.mkdir(parents=True, exist_ok=True)
+    written = []
+    for name, (columns, archived, current) in tables.items():
+        if report_format in (REPORT_FORMAT_CSV, REPORT_FORMAT_BOTH):
+            path = directory / f"{prefix}_{name}.csv"
+            _write_csv(path, columns, _rows(archived, current))
+            written.append(path)
+        if report_format in (REPORT_FORMAT_JSON, REPORT_FORMAT_BOTH):
+            path = directory / f"{prefix}_{name}.json"
+            _write_json(path, columns, _rows(archived, current))
+            written.append(path)
+    return written
+
+
+def _snapshot(coordinator) -> dict[str, tuple[list[str], dict, list]]:
+    """Flache Kopie der Archive im Event-Loop; die Einträge selbst werden nie verändert, nur ersetzt"""
+    archive = coordinator.archive
+    daily, monthly, yearly = coordinator.daily, coordinator.monthly, coordinator.yearly
+
+    current_day = []
+    if daily.last_reset is not None:
+        current_day = [
+            daily.last_reset.date().isoformat(),
+            round(daily.accumulated, 4), round(daily.cost, 4),
+            round(yearly.accumulated, 4), round(yearly.cost, 4),
+        ]
+    current_month = []
+    if monthly.last_reset is not None:
+        current_month = [monthly.last_reset.strftime("%Y-%m"), round(monthly.accumulated, 4), round(monthly.cost, 4)]
+    current_year = []
+    if yearly.last_reset is not None:
+        current_year = [yearly.last_reset.date().isoformat(), round(yearly.accumulated, 4), round(yearly.cost, 4)]
+
+    tables = {
+        "days": (DAY_COLUMNS, dict(archive.days), current_day),
+        "months": (MONTH_COLUMNS, dict(archive.months), current_month),
+        "billing_years": (BILLING_YEAR_COLUMNS, dict(archive.billing_years), current_year),
+    }
+
+    if coordinator.solar_yield_day:
+        solar = coordinator.solar
+        current = {}
+        for period, key_format in ((SOLAR_DAY, "%Y-%m-%d"), (SOLAR_MONTH, "%Y-%m"), (SOLAR_YEAR, "%Y-%m-%d")):
+            last_reset = solar.last_resets[period]
+            current[period] = [last_reset.strftime(key_format), round(solar.totals[period], 4)] if last_reset else []
+        tables["solar_days"] = (SOLAR_DAY_COLUMNS, dict(archive.solar_days), current[SOLAR_DAY])
+        tables["solar_months"] = (SOLAR_MONTH_COLUMNS, dict(archive.solar_months), current[SOLAR_MONTH])
+        tables["solar_billing_years"] = (
+            SOLAR_BILLING_YEAR_COLUMNS, dict(archive.solar_billing_years), current[SOLAR_YEAR]
+        )
+
+    return tables
+
+
+async def async_export_report(hass: HomeAssistant, coordinators: dict[str, Any], report_format: str) -> list[Path]:
+    """Exportiert die Reports aller Einträge nach /config/stromkosten_rechner"""
+    directory = Path(hass.config.path(DOMAIN))
+    written: list[Path] = []
+    # Kopie: Einträge können während des Exports entladen oder neu geladen werden
+    for entry_id, coordinator in list(coordinators.items()):
+        tables = _snapshot(coordinator)
+        written += await hass.async_add_executor_job(write_report, directory, entry_id, tables, report_format)
+
+    _LOGGER.info("Report exportiert: %s", ", ".join(str(path) for path in written))
+    return written
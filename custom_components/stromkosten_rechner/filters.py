@@ -0,0 +1,144 @@
+"""Streaming-Filter für Leistungswerte (Ausreißer- und Glitch-Erkennung)."""
+from collections import deque
+from datetime import datetime
+from typing import Optional
+
+# Hampel-Filter: Abweichung vom Median in Vielfachen der (skalierten) MAD
+HAMPEL_THRESHOLD = 3.0
+MAD_SCALE = 1.4826
+
+# Bei konstanter Last ist die MAD 0; kleine Schwankungen sollen dann nicht verworfen werden
+HAMPEL_MIN_DEVIATION = 100.0  # W
+
+# Ein verworfener Wert, der so lange unverändert ansteht, gilt als neues Niveau
+PENDING_PERSISTENCE = 60.0  # s
+
+REJECT_RANGE = "range"
+REJECT_RATE = "rate"
+REJECT_OUTLIER = "outlier"
+
+
+def _median(values) -> float:
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[middle]
+    return (ordered[middle - 1] + ordered[middle]) / 2
+
+
+class PowerFilter:
+    """Prüft jeden neuen Messwert eines Sensors mit festem Speicher.
+
+    Die Prüfungen laufen in fester Reihenfolge: plausibler Wertebereich,
+    maximale Änderungsrate gegenüber dem letzten akzeptierten Wert über die
+    Zeit seit dem zuletzt geprüften Messwert (`hold` zählt als Prüfung) und
+    Hampel-Test gegen den Median der letzten `window` Rohwerte. Werte außerhalb
+    des Wertebereichs gelangen nicht ins Fenster.
+
+    Ein Hampel-Ausreißer ist zunächst nur verdächtig: liegt der nächste
+    Messwert auf seinem Niveau, war es ein Lastsprung, der zweite Wert wird
+    übernommen und das Fenster beginnt neu. Erst wenn der nächste Messwert das
+    Niveau nicht bestätigt, zählt der Wert in `rejected` als Ausreißer.
+
+    Nach einer Ablehnung wegen Änderungsrate oder Ausreißer merkt sich
+    `pending` den Rohwert; der Coordinator prüft ihn dann bei jedem Schritt
+    erneut (`recheck`), ohne ihn noch einmal ins Fenster zu schreiben. Steht
+    der Zustand seit `PENDING_PERSISTENCE` Sekunden unverändert an, wird der
+    Wert als neues Niveau übernommen und das Fenster beginnt mit ihm neu, auch
+    wenn der Sensor keine neuen Zustände meldet.
+    """
+
+    def __init__(self, min_power: float, max_power: float, max_rate: float = 0.0, window: int = 0):
+        self._window: Optional[deque] = None
+        self.configure(min_power, max_power, max_rate, window)
+        self._last_value: Optional[float] = None
+        # Zeitpunkt, zu dem der Rohwert zuletzt geprüft wurde
+        self._last_sample_time: Optional[datetime] = None
+        self.accepted = 0
+        self.rejected = {REJECT_RANGE: 0, REJECT_RATE: 0, REJECT_OUTLIER: 0}
+        # Zuletzt verworfener Rohwert, der erneut geprüft wird
+        self.pending: Optional[float] = None
+        self._pending_reason: Optional[str] = None
+        # Abstand, innerhalb dessen der nächste Wert einen verdächtigen Ausreißer als Lastsprung bestätigt
+        self._pending_tolerance = 0.0
+
+    def configure(self, min_power: float, max_power: float, max_rate: float = 0.0, window: int = 0) -> None:
+        """Übernimmt neue Grenzwerte; die letzten Messwerte im Fenster bleiben erhalten."""
+        self.min_power = min_power
+        self.max_power = max_power
+        self.max_rate = max_rate
+        if window < 3:
+            self._window = None
+        elif self._window is None or self._window.maxlen != window:
+            self._window = deque(self._window or (), maxlen=window)
+
+    @property
+    def rejected_total(self) -> int:
+        return sum(self.rejected.values())
+
+    def check(self, value: float, now: datetime) -> bool:
+        """Gibt True zurück, wenn der neue Messwert übernommen werden soll."""
+        reason = None
+        last_sample_time = self._last_sample_time
+        self._last_sample_time = now
+
+        suspect = self.pending if self._pending_reason == REJECT_OUTLIER else None
+        level_shift = suspect is not None and abs(value - suspect) <= self._pending_tolerance
+        if suspect is not None and not level_shift:
+            # Der verdächtige Wert blieb vereinzelt: jetzt erst als Ausreißer zählen
+            self.rejected[REJECT_OUTLIER] += 1
+
+        if not self.min_power <= value <= self.max_power:
+            reason = REJECT_RANGE
+        elif self.max_rate > 0 and self._last_value is not None and last_sample_time is not None:
+            seconds = max((now - last_sample_time).total_seconds(), 1.0)
+            if abs(value - self._last_value) / seconds > self.max_rate:
+                reason = REJECT_RATE
+
+        window = self._window
+        if window is not None and reason != REJECT_RANGE:
+            if reason is None and level_shift:
+                window.clear()
+                window.append(suspect)
+            elif reason is None and len(window) == window.maxlen:
+                median = _median(window)
+                deviation = HAMPEL_THRESHOLD * MAD_SCALE * _median(abs(v - median) for v in window)
+                tolerance = max(deviation, HAMPEL_MIN_DEVIATION)
+                if abs(value - median) > tolerance:
+                    reason = REJECT_OUTLIER
+                    self._pending_tolerance = tolerance
+            window.append(value)
+
+        if reason is not None:
+            # Unplausible Werte bleiben verworfen, bis der Sensor einen neuen Wert meldet
+            self.pending = value if reason != REJECT_RANGE else None
+            self._pending_reason = reason
+            if reason != REJECT_OUTLIER:
+                self.rejected[reason] += 1
+            return False
+
+        self._accept(value)
+        return True
+
+    def recheck(self, value: float, last_changed: datetime, now: datetime) -> bool:
+        """Prüft den verworfenen Rohwert erneut. Gibt True zurück, wenn er jetzt übernommen werden soll."""
+        self._last_sample_time = now
+        if value != self.pending or (now - last_changed).total_seconds() < PENDING_PERSISTENCE:
+            return False
+
+        if self._window is not None:
+            self._window.clear()
+            self._window.append(value)
+        self._accept(value)
+        return True
+
+    def _accept(self, value: float) -> None:
+        self.pending = None
+        self._pending_reason = None
+        self.accepted += 1
+        self._last_value = value
+
+    def hold(self, now: datetime) -> None:
+        """Der Sensor hat keinen neuen Wert gemeldet: der letzte Rohwert gilt noch zum Zeitpunkt `now`"""
+        if self._last_sample_time is not None:
+            self._last_sample_time = now
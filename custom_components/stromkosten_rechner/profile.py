@@ -0,0 +1,112 @@
+"""Lastprofil: Verbrauch und Kosten nach Wochentag und Tageszeit über das Abrechnungsjahr."""
+from datetime import date, datetime
+from typing import Any, Callable, Optional
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+
+WEEKDAYS = 7
+
+
+class LoadProfile:
+    """Matrix Wochentag × Zeitschlitz (Stunde oder Viertelstunde) mit festem Speicher.
+
+    Pro Zelle werden Energie, Kosten und die Anzahl der erlebten Zeitschlitze
+    summiert; der Mittelwert ergibt sich erst beim Auslesen. Ein Segment zählt
+    vollständig zum Schlitz seines Beginns. Bei stündlicher Auflösung ist das
+    exakt, weil der Coordinator an Stundengrenzen teilt.
+    """
+
+    def __init__(self, hass: HomeAssistant, slots_per_hour: int, period_start: Callable[[datetime], datetime]):
+        self.store = Store(hass, 1, f"{DOMAIN}_load_profile")
+        self.slots_per_hour = slots_per_hour
+        self.slots_per_day = 24 * slots_per_hour
+        self._period_start = period_start
+        self.last_reset: Optional[datetime] = None
+        # Zuletzt gezählter Zeitschlitz (Datum, Schlitz); gespeichert, damit ein Neustart ihn nicht erneut zählt
+        self._current_cell: Optional[tuple[date, int]] = None
+        self._clear()
+
+    def _clear(self) -> None:
+        size = WEEKDAYS * self.slots_per_day
+        self.energy = [0.0] * size
+        self.cost = [0.0] * size
+        self.count = [0] * size
+
+    def restore(self, stored_data: Optional[dict[str, Any]]) -> None:
+        if not stored_data or stored_data.get("slots_per_hour") != self.slots_per_hour:
+            # Andere Auflösung: Profil beginnt neu
+            return
+        try:
+            size = WEEKDAYS * self.slots_per_day
+            energy = [float(v) for v in stored_data["energy"]]
+            cost = [float(v) for v in stored_data["cost"]]
+            count = [int(v) for v in stored_data["count"]]
+            if not len(energy) == len(cost) == len(count) == size:
+                return
+            self.energy, self.cost, self.count = energy, cost, count
+            last_reset = stored_data.get("last_reset")
+            self.last_reset = dt_util.as_local(datetime.fromisoformat(last_reset)) if last_reset else None
+            current_cell = stored_data.get("current_cell")
+            if current_cell:
+                self._current_cell = (date.fromisoformat(current_cell[0]), int(current_cell[1]))
+        except (ValueError, TypeError, KeyError):
+            self._clear()
+
+    def data_to_save(self) -> dict[str, Any]:
+        return {
+            "slots_per_hour": self.slots_per_hour,
+            "last_reset": self.last_reset.isoformat() if self.last_reset else None,
+            "energy": [round(v, 5) for v in self.energy],
+            "cost": [round(v, 5) for v in self.cost],
+            "count": self.count,
+            "current_cell": [self._current_cell[0].isoformat(), self._current_cell[1]] if self._current_cell else None,
+        }
+
+    def add(self, start: datetime, energy_kwh: float, cost: float) -> bool:
+        """Addiert ein Energie-Segment. Gibt True zurück, wenn sich etwas geändert hat."""
+        local = dt_util.as_local(start)
+        changed = False
+
+        period_start = self._period_start(local)
+        if self.last_reset is None or period_start > self.last_reset:
+            self._clear()
+            self.last_reset = period_start
+            self._current_cell = None
+            changed = True
+
+        slot = local.hour * self.slots_per_hour + local.minute * self.slots_per_hour // 60
+        index = local.weekday() * self.slots_per_day + slot
+
+        # Jeder erlebte Zeitschlitz zählt einmal, auch ohne Verbrauch
+        cell = (local.date(), slot)
+        if cell != self._current_cell:
+            self._current_cell = cell
+            self.count[index] += 1
+            changed = True
+
+        if energy_kwh > 0:
+            self.energy[index] += energy_kwh
+            self.cost[index] += cost
+            changed = True
+
+        return changed
+
+    def as_dict(self) -> dict[str, Any]:
+        """Mittelwerte pro Wochentag (Montag zuerst) und Zeitschlitz, None ohne Daten"""
+        energy, cost, count = [], [], []
+        for day in range(WEEKDAYS):
+            cells = range(day * self.slots_per_day, (day + 1) * self.slots_per_day)
+            energy.append([round(self.energy[i] / self.count[i], 4) if self.count[i] else None for i in cells])
+            cost.append([round(self.cost[i] / self.count[i], 4) if self.count[i] else None for i in cells])
+            count.append([self.count[i] for i in cells])
+        return {
+            "slots_per_hour": self.slots_per_hour,
+            "since": self.last_reset.isoformat() if self.last_reset else None,
+            "energy_kwh": energy,
+            "cost": cost,
+            "samples": count,
+        }
@@ -1,606 +1,375 @@
 import logging
-from datetime import datetime, timedelta
+from abc import abstractmethod
+from datetime import date, datetime, timedelta
 from typing import Any, Optional
 
 from homeassistant.components.sensor import SensorEntity, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import UnitOfEnergy, STATE_UNKNOWN, UnitOfTime
+from homeassistant.const import EntityCategory, UnitOfEnergy, UnitOfPower, STATE_UNKNOWN, UnitOfTime
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.event import async_track_state_change_event, async_track_time_interval
-from homeassistant.helpers.storage import Store
-from homeassistant.util import dt as dt_util
-
-from .const import (
-    DOMAIN,
-    CONF_POWER_SENSORS,
-    CONF_SOLAR_POWER,
-    CONF_SOLAR_YIELD_DAY,
-    CONF_YEARLY_START_DAY,
-    CONF_YEARLY_START_MONTH,
-    CONF_COST_PER_KWH,
-)
+
+from .const import DOMAIN
+from .archive import DAY_COST, DAY_KWH, DAY_YTD_COST, DAY_YTD_KWH
+from .coordinator import StromkostenCoordinator
+from .solar import SOLAR_DAY, SOLAR_MONTH, SOLAR_YEAR
 
 _LOGGER = logging.getLogger(__name__)
 
-# Update-Intervall für kontinuierliche Berechnung
-UPDATE_INTERVAL = timedelta(seconds=10)
+# Mindestabstand zwischen zwei Zustands-Schreibvorgängen, wenn die Sensoren
+# von der Zustands-Historie ausgenommen sind (die Langzeitstatistik kommt
+# dann aus dem stündlichen Import des Coordinators)
+REDUCED_WRITE_INTERVAL = timedelta(minutes=15)
 
 
-class StromkostenConsumptionDaily(SensorEntity):
-    _attr_name = "Daily Consumption"
-    _attr_unique_id = "stromkosten_consumption_daily"
-    _attr_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
-    _attr_state_class = SensorStateClass.TOTAL
-    _attr_icon = "mdi:lightning-bolt"
+class StromkostenEntity(SensorEntity):
+    """Basis für alle Sensoren, die vom Coordinator aktualisiert werden."""
+
+    _attr_should_poll = False
 
-    def __init__(self, hass: HomeAssistant, power_sensors: list[str]):
-        self.hass = hass
-        self.power_sensors = power_sensors
+    def __init__(self, coordinator: StromkostenCoordinator):
+        self.coordinator = coordinator
         self._state = 0.0
-        self._last_reset = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        self._accumulated = 0.0
-        self._last_update_time = None  # NEU: Zeitstempel des letzten Updates
-        self._store = Store(hass, 1, f"{DOMAIN}_daily_consumption")
+        self._last_write: Optional[datetime] = None
+        if coordinator.exclude_from_history:
+            self._attr_state_class = None
 
     async def async_added_to_hass(self) -> None:
-        stored_data = await self._store.async_load()
-        if stored_data:
-            try:
-                self._accumulated = float(stored_data.get("accumulated", 0.0))
-                self._last_reset = datetime.fromisoformat(stored_data.get("last_reset", self._last_reset.isoformat()))
-            except (ValueError, TypeError):
-                pass
-        
-        # Initialisiere Zeitstempel
-        self._last_update_time = datetime.now()
-        
         self.async_on_remove(
-            async_track_state_change_event(
-                self.hass,
-                self.power_sensors,
-                self._power_changed
-            )
+            self.coordinator.async_add_listener(self._handle_coordinator_update)
         )
-        
-        # Periodischer Update alle 10 Sekunden (auch wenn sich nichts ändert)
-        self.async_on_remove(
-            async_track_time_interval(
-                self.hass,
-                self._periodic_update,
-                UPDATE_INTERVAL
-            )
-        )
-        
-        await self.async_update()
+        self._update_state()
 
     @callback
-    def _power_changed(self, event):
-        """Wird aufgerufen, wenn sich ein Power-Sensor ändert"""
-        self.async_schedule_update_ha_state(force_refresh=True)
-
-    async def _periodic_update(self, now):
-        """Periodisches Update alle 10 Sekunden"""
-        await self.async_update()
-        self.async_write_ha_state()
+    def _handle_coordinator_update(self) -> None:
+        """Wird nach jedem Integrationsschritt des Coordinators aufgerufen"""
+        self._update_state()
 
-    async def async_update(self) -> None:
-        now = datetime.now()
-        current_date = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        
-        # Reset bei neuem Tag
-        if current_date > self._last_reset:
-            self._accumulated = 0.0
-            self._last_reset = current_date
-            self._last_update_time = now
-            await self._store.async_save({
-                "accumulated": self._accumulated, 
-                "last_reset": self._last_reset.isoformat()
-            })
-            self._state = 0.0
-            return
+        if self.coordinator.exclude_from_history:
+            now = self.coordinator.utcnow()
+            if self._last_write is not None and now - self._last_write < REDUCED_WRITE_INTERVAL:
+                return
+            self._last_write = now
 
-        # Berechne Zeit seit letztem Update
-        if self._last_update_time is None:
-            self._last_update_time = now
-            return
-        
-        time_delta = (now - self._last_update_time).total_seconds()
-        
-        # Verhindere negative oder zu große Zeitdifferenzen
-        if time_delta <= 0 or time_delta > 3600:
-            self._last_update_time = now
-            return
+        self.async_write_ha_state()
 
-        # Summiere aktuelle Leistung aller Sensoren
-        total_power = 0.0
-        for sensor_id in self.power_sensors:
-            state = self.hass.states.get(sensor_id)
-            if state and state.state not in (STATE_UNKNOWN, None, "unavailable"):
-                try:
-                    total_power += float(state.state)
-                except ValueError:
-                    pass
-
-        # Berechne Energie: Power (W) * Zeit (s) / 3600 / 1000 = kWh
-        # Formel: kWh = (Watt * Sekunden) / 3.600.000
-        if total_power > 0:
-            energy_kwh = (total_power * time_delta) / 3600000
-            self._accumulated += energy_kwh
-            await self._store.async_save({
-                "accumulated": self._accumulated, 
-                "last_reset": self._last_reset.isoformat()
-            })
-
-        self._last_update_time = now
-        self._state = round(self._accumulated, 3)
+    @abstractmethod
+    @callback
+    def _update_state(self) -> None:
+        """Übernimmt den aktuellen Wert aus dem Coordinator in `_state`"""
 
     @property
     def state(self) -> str | None:
         return self._state if self._state is not None else STATE_UNKNOWN
 
 
-class StromkostenConsumptionMonthly(SensorEntity):
+class StromkostenConsumptionDaily(StromkostenEntity):
+    _attr_name = "Daily Consumption"
+    _attr_unique_id = "stromkosten_consumption_daily"
+    _attr_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
+    _attr_state_class = SensorStateClass.TOTAL
+    _attr_icon = "mdi:lightning-bolt"
+
+    @callback
+    def _update_state(self) -> None:
+        self._state = round(self.coordinator.daily.accumulated, 3)
+
+
+class StromkostenConsumptionMonthly(StromkostenEntity):
     _attr_name = "Monthly Consumption"
     _attr_unique_id = "stromkosten_consumption_monthly"
     _attr_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
     _attr_state_class = SensorStateClass.TOTAL
     _attr_icon = "mdi:calendar-month"
 
-    def __init__(self, hass: HomeAssistant, power_sensors: list[str]):
-        self.hass = hass
-        self.power_sensors = power_sensors
-        self._state = 0.0
-        self._last_reset = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        self._accumulated = 0.0
-        self._last_update_time = None
-        self._store = Store(hass, 1, f"{DOMAIN}_monthly_consumption")
+    @callback
+    def _update_state(self) -> None:
+        self._state = round(self.coordinator.monthly.accumulated, 3)
 
-    async def async_added_to_hass(self) -> None:
-        stored_data = await self._store.async_load()
-        if stored_data:
-            try:
-                self._accumulated = float(stored_data.get("accumulated", 0.0))
-                self._last_reset = datetime.fromisoformat(stored_data.get("last_reset", self._last_reset.isoformat()))
-            except (ValueError, TypeError):
-                pass
-        
-        self._last_update_time = datetime.now()
-        
-        self.async_on_remove(
-            async_track_state_change_event(
-                self.hass,
-                self.power_sensors,
-                self._power_changed
-            )
-        )
-        
-        self.async_on_remove(
-            async_track_time_interval(
-                self.hass,
-                self._periodic_update,
-                UPDATE_INTERVAL
-            )
-        )
-        
-        await self.async_update()
+
+class StromkostenConsumptionYearly(StromkostenEntity):
+    _attr_name = "Yearly Consumption"
+    _attr_unique_id = "stromkosten_consumption_yearly"
+    _attr_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
+    _attr_state_class = SensorStateClass.TOTAL
+    _attr_icon = "mdi:calendar-year"
 
     @callback
-    def _power_changed(self, event):
-        self.async_schedule_update_ha_state(force_refresh=True)
+    def _update_state(self) -> None:
+        self._state = round(self.coordinator.yearly.accumulated, 3)
 
-    async def _periodic_update(self, now):
-        await self.async_update()
-        self.async_write_ha_state()
 
-    async def async_update(self) -> None:
-        now = datetime.now()
-        current_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        
-        if current_month > self._last_reset:
-            self._accumulated = 0.0
-            self._last_reset = current_month
-            self._last_update_time = now
-            await self._store.async_save({
-                "accumulated": self._accumulated, 
-                "last_reset": self._last_reset.isoformat()
-            })
-            self._state = 0.0
-            return
-
-        if self._last_update_time is None:
-            self._last_update_time = now
-            return
-        
-        time_delta = (now - self._last_update_time).total_seconds()
-        
-        if time_delta <= 0 or time_delta > 3600:
-            self._last_update_time = now
-            return
+class StromkostenConsumptionYearlyPrognosis(StromkostenEntity):
+    _attr_name = "Yearly Consumption Prognosis"
+    _attr_unique_id = "stromkosten_consumption_yearly_prognosis"
+    _attr_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
+    _attr_state_class = SensorStateClass.TOTAL
+    _attr_icon = "mdi:crystal-ball"
 
-        total_power = 0.0
-        for sensor_id in self.power_sensors:
-            state = self.hass.states.get(sensor_id)
-            if state and state.state not in (STATE_UNKNOWN, None, "unavailable"):
-                try:
-                    total_power += float(state.state)
-                except ValueError:
-                    pass
-
-        if total_power > 0:
-            energy_kwh = (total_power * time_delta) / 3600000
-            self._accumulated += energy_kwh
-            await self._store.async_save({
-                "accumulated": self._accumulated, 
-                "last_reset": self._last_reset.isoformat()
-            })
-
-        self._last_update_time = now
-        self._state = round(self._accumulated, 3)
+    @callback
+    def _update_state(self) -> None:
+        self._state = round(self.coordinator.billing.prognosis_kwh, 2)
 
-    @property
-    def state(self) -> str | None:
-        return self._state if self._state is not None else STATE_UNKNOWN
 
+class StromkostenCostYearly(StromkostenEntity):
+    _attr_name = "Yearly Consumption Cost"
+    _attr_unique_id = "stromkosten_cost_yearly"
+    _attr_unit_of_measurement = "€"
+    _attr_icon = "mdi:cash"
 
-class StromkostenConsumptionYearly(SensorEntity):
-    _attr_name = "Yearly Consumption"
-    _attr_unique_id = "stromkosten_consumption_yearly"
-    _attr_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
-    _attr_state_class = SensorStateClass.TOTAL
-    _attr_icon = "mdi:calendar-year"
+    @callback
+    def _update_state(self) -> None:
+        self._state = round(self.coordinator.billing.cost_to_date, 2)
 
-    def __init__(self, hass: HomeAssistant, power_sensors: list[str], yearly_start_day: int = 1, yearly_start_month: int = 1):
-        self.hass = hass
-        self.power_sensors = power_sensors
-        self.yearly_start_day = int(yearly_start_day)
-        self.yearly_start_month = int(yearly_start_month)
-        self._state = 0.0
-        self._last_reset = self._get_yearly_start_date()
-        self._accumulated = 0.0
-        self._last_update_time = None
-        self._store = Store(hass, 1, f"{DOMAIN}_yearly_consumption")
-
-    def _get_yearly_start_date(self) -> datetime:
-        """Berechnet das Startdatum des aktuellen Abrechnungsjahres"""
-        now = datetime.now()
-        try:
-            # Versuche Datum im aktuellen Jahr
-            start_date = now.replace(month=self.yearly_start_month, day=self.yearly_start_day, hour=0, minute=0, second=0, microsecond=0)
-            
-            # Wenn in der Zukunft, nutze letztes Jahr
-            if start_date > now:
-                start_date = start_date.replace(year=now.year - 1)
-            
-            return start_date
-        except ValueError:
-            # Fallback bei ungültigem Datum
-            return now.replace(month=self.yearly_start_month, day=1, hour=0, minute=0, second=0, microsecond=0)
 
-    async def async_added_to_hass(self) -> None:
-        stored_data = await self._store.async_load()
-        if stored_data:
-            try:
-                self._accumulated = float(stored_data.get("accumulated", 0.0))
-                self._last_reset = datetime.fromisoformat(stored_data.get("last_reset", self._last_reset.isoformat()))
-            except (ValueError, TypeError):
-                pass
-        
-        self._last_update_time = datetime.now()
-        
-        self.async_on_remove(
-            async_track_state_change_event(
-                self.hass,
-                self.power_sensors,
-                self._power_changed
-            )
-        )
-        
-        self.async_on_remove(
-            async_track_time_interval(
-                self.hass,
-                self._periodic_update,
-                UPDATE_INTERVAL
-            )
-        )
-        
-        await self.async_update()
+class StromkostenCostYearlyPrognosis(StromkostenEntity):
+    _attr_name = "Yearly Consumption Cost Prognosis"
+    _attr_unique_id = "stromkosten_cost_yearly_prognosis"
+    _attr_unit_of_measurement = "€"
+    _attr_icon = "mdi:cash-multiple"
 
     @callback
-    def _power_changed(self, event):
-        self.async_schedule_update_ha_state(force_refresh=True)
+    def _update_state(self) -> None:
+        self._state = round(self.coordinator.billing.expected_invoice, 2)
 
-    async def _periodic_update(self, now):
-        await self.async_update()
-        self.async_write_ha_state()
 
-    async def async_update(self) -> None:
-        now = datetime.now()
-        new_reset_date = self._get_yearly_start_date()
-        
-        if new_reset_date > self._last_reset:
-            self._accumulated = 0.0
-            self._last_reset = new_reset_date
-            self._last_update_time = now
-            await self._store.async_save({
-                "accumulated": self._accumulated, 
-                "last_reset": self._last_reset.isoformat()
-            })
-            self._state = 0.0
-            return
+class StromkostenAdvancePayments(StromkostenEntity):
+    _attr_name = "Advance Payments"
+    _attr_unique_id = "stromkosten_advance_payments"
+    _attr_unit_of_measurement = "€"
+    _attr_icon = "mdi:bank-transfer"
 
-        if self._last_update_time is None:
-            self._last_update_time = now
-            return
-        
-        time_delta = (now - self._last_update_time).total_seconds()
-        
-        if time_delta <= 0 or time_delta > 3600:
-            self._last_update_time = now
-            return
+    @callback
+    def _update_state(self) -> None:
+        self._state = round(self.coordinator.billing.payments, 2)
 
-        total_power = 0.0
-        for sensor_id in self.power_sensors:
-            state = self.hass.states.get(sensor_id)
-            if state and state.state not in (STATE_UNKNOWN, None, "unavailable"):
-                try:
-                    total_power += float(state.state)
-                except ValueError:
-                    pass
-
-        if total_power > 0:
-            energy_kwh = (total_power * time_delta) / 3600000
-            self._accumulated += energy_kwh
-            await self._store.async_save({
-                "accumulated": self._accumulated, 
-                "last_reset": self._last_reset.isoformat()
-            })
-
-        self._last_update_time = now
-        self._state = round(self._accumulated, 3)
 
-    @property
-    def state(self) -> str | None:
-        return self._state if self._state is not None else STATE_UNKNOWN
+class StromkostenBillingBalance(StromkostenEntity):
+    """Prognose der Jahresabrechnung: positiv = Rückerstattung, negativ = Nachzahlung."""
 
+    _attr_name = "Billing Balance Prognosis"
+    _attr_unique_id = "stromkosten_billing_balance_prognosis"
+    _attr_unit_of_measurement = "€"
+    _attr_icon = "mdi:scale-balance"
+
+    @callback
+    def _update_state(self) -> None:
+        self._state = round(self.coordinator.billing.balance, 2)
 
-def get_days_in_current_year_period(yearly_start_day: int, yearly_start_month: int) -> int:
-    """Berechnet die Anzahl der Tage seit Start des Abrechnungsjahres bis heute"""
-    now = datetime.now()
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        billing = self.coordinator.billing
+        return {
+            "energy_cost": round(billing.energy_cost, 2),
+            "base_fee_monthly": billing.base_fee,
+            "advance_payment_monthly": billing.advance_payment,
+            "payments_to_date": round(billing.payments, 2),
+            "expected_invoice": round(billing.expected_invoice, 2),
+        }
+
+
+def _one_year_earlier(day: date) -> date:
     try:
-        start_date = now.replace(month=yearly_start_month, day=yearly_start_day, hour=0, minute=0, second=0, microsecond=0)
-        if start_date > now:
-            start_date = start_date.replace(year=now.year - 1)
-        return (now - start_date).days + 1
+        return day.replace(year=day.year - 1)
     except ValueError:
-        return 1
+        # 29. Februar
+        return day.replace(year=day.year - 1, day=28)
 
 
-class StromkostenConsumptionYearlyPrognosis(SensorEntity):
-    _attr_name = "Yearly Consumption Prognosis"
-    _attr_unique_id = "stromkosten_consumption_yearly_prognosis"
-    _attr_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
-    _attr_state_class = SensorStateClass.TOTAL
-    _attr_icon = "mdi:crystal-ball"
+class StromkostenComparisonEntity(StromkostenEntity):
+    """Vergleich eines laufenden Zeitraums mit einem archivierten Referenzzeitraum.
 
-    def __init__(self, hass: HomeAssistant, power_sensors: list[str], yearly_start_day: int = 1, yearly_start_month: int = 1):
-        self.hass = hass
-        self.power_sensors = power_sensors
-        self.yearly_start_day = int(yearly_start_day)
-        self.yearly_start_month = int(yearly_start_month)
-        self._state = 0.0
+    Zustand ist der Referenzwert; aktueller Wert und Differenz stehen in den Attributen.
+    """
 
-    async def async_added_to_hass(self) -> None:
-        self.async_on_remove(
-            async_track_state_change_event(
-                self.hass,
-                self.power_sensors,
-                self._power_changed
-            )
-        )
-        await self.async_update()
+    _attr_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
+    _attr_icon = "mdi:compare-horizontal"
+
+    def __init__(self, coordinator: StromkostenCoordinator):
+        super().__init__(coordinator)
+        self._attributes: dict[str, Any] = {}
 
     @callback
-    def _power_changed(self, event):
-        self.async_schedule_update_ha_state(force_refresh=True)
-
-    async def async_update(self) -> None:
-        yearly_consumption = self.hass.states.get("sensor.stromkosten_consumption_yearly")
-        
-        if not yearly_consumption or yearly_consumption.state in (STATE_UNKNOWN, None, "unavailable"):
-            self._state = 0.0
+    def _update_state(self) -> None:
+        current_kwh, current_cost, reference = self._lookup()
+        if reference is None:
+            self._state = None
+            self._attributes = {"current": round(current_kwh, 3)}
             return
-        
-        try:
-            current_consumption = float(yearly_consumption.state)
-            days_in_period = get_days_in_current_year_period(self.yearly_start_day, self.yearly_start_month)
-            
-            days_in_year = 365
-            avg_daily = current_consumption / days_in_period
-            
-            self._state = round(avg_daily * days_in_year, 2)
-        except (ValueError, TypeError, ZeroDivisionError):
-            self._state = 0.0
+
+        reference_kwh, reference_cost = reference
+        self._state = round(reference_kwh, 3)
+        self._attributes = {
+            "current": round(current_kwh, 3),
+            "difference": round(current_kwh - reference_kwh, 3),
+            "difference_percent": round((current_kwh / reference_kwh - 1) * 100, 1) if reference_kwh > 0 else None,
+            "current_cost": round(current_cost, 2),
+            "reference_cost": round(reference_cost, 2),
+        }
+
+    @abstractmethod
+    def _lookup(self) -> tuple[float, float, Optional[tuple[float, float]]]:
+        """Aktuelle kWh, aktuelle Kosten und (kWh, Kosten) des Referenzzeitraums oder None"""
 
     @property
-    def state(self) -> str | None:
-        return self._state if self._state is not None else STATE_UNKNOWN
+    def extra_state_attributes(self) -> dict[str, Any]:
+        return self._attributes
 
 
-class StromkostenCostYearly(SensorEntity):
-    _attr_name = "Yearly Consumption Cost"
-    _attr_unique_id = "stromkosten_cost_yearly"
-    _attr_unit_of_measurement = "€"
-    _attr_icon = "mdi:cash"
+class StromkostenConsumptionLastWeek(StromkostenComparisonEntity):
+    _attr_name = "Consumption Same Weekday Last Week"
+    _attr_unique_id = "stromkosten_consumption_same_weekday_last_week"
 
-    def __init__(self, hass: HomeAssistant, power_sensors: list[str], cost_per_kwh: float, yearly_start_day: int = 1, yearly_start_month: int = 1):
-        self.hass = hass
-        self.power_sensors = power_sensors
-        self.cost_per_kwh = float(cost_per_kwh)
-        self.yearly_start_day = int(yearly_start_day)
-        self.yearly_start_month = int(yearly_start_month)
-        self._state = 0.0
+    def _lookup(self):
+        daily = self.coordinator.daily
+        if daily.last_reset is None:
+            return daily.accumulated, daily.cost, None
+        entry = self.coordinator.archive.day(daily.last_reset.date() - timedelta(days=7))
+        return daily.accumulated, daily.cost, (entry[DAY_KWH], entry[DAY_COST]) if entry else None
 
-    async def async_added_to_hass(self) -> None:
-        self.async_on_remove(
-            async_track_state_change_event(
-                self.hass,
-                self.power_sensors,
-                self._power_changed
-            )
-        )
+
+class StromkostenConsumptionMonthLastYear(StromkostenComparisonEntity):
+    _attr_name = "Consumption Same Month Last Year"
+    _attr_unique_id = "stromkosten_consumption_same_month_last_year"
+
+    def _lookup(self):
+        monthly = self.coordinator.monthly
+        if monthly.last_reset is None:
+            return monthly.accumulated, monthly.cost, None
+        entry = self.coordinator.archive.month(_one_year_earlier(monthly.last_reset.date()))
+        return monthly.accumulated, monthly.cost, tuple(entry) if entry else None
+
+
+class StromkostenConsumptionBillingYearLastYear(StromkostenComparisonEntity):
+    """Abrechnungsjahr bis heute gegenüber dem Vorjahr bis zum selben Tag."""
+
+    _attr_name = "Consumption Billing Year To Date Last Year"
+    _attr_unique_id = "stromkosten_consumption_billing_year_to_date_last_year"
+
+    def _lookup(self):
+        yearly = self.coordinator.yearly
+        daily = self.coordinator.daily
+        if daily.last_reset is None:
+            return yearly.accumulated, yearly.cost, None
+        entry = self.coordinator.archive.day(_one_year_earlier(daily.last_reset.date()))
+        return yearly.accumulated, yearly.cost, (entry[DAY_YTD_KWH], entry[DAY_YTD_COST]) if entry else None
+
+
+class StromkostenBaseLoad(StromkostenEntity):
+    _attr_name = "Base Load"
+    _attr_unique_id = "stromkosten_base_load"
+    _attr_unit_of_measurement = UnitOfPower.WATT
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_icon = "mdi:power-sleep"
 
     @callback
-    def _power_changed(self, event):
-        self.async_schedule_update_ha_state(force_refresh=True)
-
-    async def async_update(self) -> None:
-        yearly_consumption = self.hass.states.get("sensor.stromkosten_consumption_yearly")
-        
-        if yearly_consumption and yearly_consumption.state not in (STATE_UNKNOWN, None, "unavailable"):
-            try:
-                consumption = float(yearly_consumption.state)
-                self._state = round(consumption * self.cost_per_kwh, 2)
-            except ValueError:
-                self._state = 0.0
+    def _update_state(self) -> None:
+        base_load = self.coordinator.base_load.base_load
+        self._state = round(base_load, 1) if base_load is not None else None
 
     @property
-    def state(self) -> str | None:
-        return self._state if self._state is not None else STATE_UNKNOWN
+    def extra_state_attributes(self) -> dict[str, Any]:
+        return {"nights": self.coordinator.base_load.nights}
 
 
-class StromkostenCostYearlyPrognosis(SensorEntity):
-    _attr_name = "Yearly Consumption Cost Prognosis"
-    _attr_unique_id = "stromkosten_cost_yearly_prognosis"
-    _attr_unit_of_measurement = "€"
-    _attr_icon = "mdi:cash-multiple"
+class StromkostenBaseLoadYearlyConsumption(StromkostenEntity):
+    _attr_name = "Base Load Yearly Consumption"
+    _attr_unique_id = "stromkosten_base_load_yearly_consumption"
+    _attr_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
+    _attr_icon = "mdi:power-sleep"
 
-    def __init__(self, hass: HomeAssistant, power_sensors: list[str], cost_per_kwh: float, yearly_start_day: int = 1, yearly_start_month: int = 1):
-        self.hass = hass
-        self.power_sensors = power_sensors
-        self.cost_per_kwh = float(cost_per_kwh)
-        self.yearly_start_day = int(yearly_start_day)
-        self.yearly_start_month = int(yearly_start_month)
-        self._state = 0.0
+    @callback
+    def _update_state(self) -> None:
+        yearly_kwh = self.coordinator.base_load.yearly_kwh
+        self._state = round(yearly_kwh, 1) if yearly_kwh is not None else None
 
-    async def async_added_to_hass(self) -> None:
-        self.async_on_remove(
-            async_track_state_change_event(
-                self.hass,
-                self.power_sensors,
-                self._power_changed
-            )
-        )
-        await self.async_update()
+
+class StromkostenBaseLoadYearlyCost(StromkostenEntity):
+    _attr_name = "Base Load Yearly Cost"
+    _attr_unique_id = "stromkosten_base_load_yearly_cost"
+    _attr_unit_of_measurement = "€"
+    _attr_icon = "mdi:cash-clock"
 
     @callback
-    def _power_changed(self, event):
-        self.async_schedule_update_ha_state(force_refresh=True)
-
-    async def async_update(self) -> None:
-        yearly_prognosis = self.hass.states.get("sensor.stromkosten_consumption_yearly_prognosis")
-        
-        if yearly_prognosis and yearly_prognosis.state not in (STATE_UNKNOWN, None, "unavailable"):
-            try:
-                consumption = float(yearly_prognosis.state)
-                self._state = round(consumption * self.cost_per_kwh, 2)
-            except ValueError:
-                self._state = 0.0
+    def _update_state(self) -> None:
+        yearly_kwh = self.coordinator.base_load.yearly_kwh
+        if yearly_kwh is None:
+            self._state = None
+            return
+        self._state = round(yearly_kwh * self.coordinator.billing.average_price, 2)
 
     @property
-    def state(self) -> str | None:
-        return self._state if self._state is not None else STATE_UNKNOWN
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Anteil der Grundlast an der Verbrauchsprognose (%)"""
+        yearly_kwh = self.coordinator.base_load.yearly_kwh
+        prognosis_kwh = self.coordinator.billing.prognosis_kwh
+        if yearly_kwh is None or prognosis_kwh <= 0:
+            return {"share": None}
+        return {"share": round(yearly_kwh / prognosis_kwh * 100, 1)}
+
+
+class StromkostenRejectedSamples(StromkostenEntity):
+    _attr_name = "Rejected Power Samples"
+    _attr_unique_id = "stromkosten_rejected_power_samples"
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_icon = "mdi:filter-remove"
 
+    @callback
+    def _update_state(self) -> None:
+        self._state = self.coordinator.rejected_samples
 
-class SolarYieldYearly(SensorEntity):
-    _attr_name = "Solar Yield Yearly"
-    _attr_unique_id = "solar_yield_yearly"
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        attributes: dict[str, Any] = {
+            sensor_id: {"accepted": power_filter.accepted, **power_filter.rejected}
+            for sensor_id, power_filter in self.coordinator.filters.items()
+        }
+        if self.coordinator.power_units.invalid_units:
+            attributes["invalid_units"] = dict(self.coordinator.power_units.invalid_units)
+        return attributes
+
+
+class StromkostenSolarYieldDaily(StromkostenEntity):
+    _attr_name = "Solar Yield Daily"
+    _attr_unique_id = "solar_yield_daily"
     _attr_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
     _attr_state_class = SensorStateClass.TOTAL
-    _attr_icon = "mdi:calendar-year"
+    _attr_icon = "mdi:solar-power"
 
-    def __init__(self, hass: HomeAssistant, solar_yield_day: Optional[str], yearly_start_day: int = 1, yearly_start_month: int = 1):
-        self.hass = hass
-        self.solar_yield_day = solar_yield_day
-        self.yearly_start_day = int(yearly_start_day)
-        self.yearly_start_month = int(yearly_start_month)
-        self._state = 0.0
-        self._last_reset = self._get_yearly_start_date()
-        self._accumulated = 0.0
-        self._last_yield_value = 0.0
-        self._store = Store(hass, 1, f"{DOMAIN}_solar_yield_yearly")
-
-    def _get_yearly_start_date(self) -> datetime:
-        now = datetime.now()
-        try:
-            start_date = now.replace(month=self.yearly_start_month, day=self.yearly_start_day, hour=0, minute=0, second=0, microsecond=0)
-            if start_date > now:
-                start_date = start_date.replace(year=now.year - 1)
-            return start_date
-        except ValueError:
-            return now.replace(month=self.yearly_start_month, day=1, hour=0, minute=0, second=0, microsecond=0)
+    @callback
+    def _update_state(self) -> None:
+        self._state = round(self.coordinator.solar.totals[SOLAR_DAY], 2)
 
-    async def async_added_to_hass(self) -> None:
-        stored_data = await self._store.async_load()
-        if stored_data:
-            try:
-                self._accumulated = float(stored_data.get("accumulated", 0.0))
-                self._last_reset = datetime.fromisoformat(stored_data.get("last_reset", self._last_reset.isoformat()))
-                self._last_yield_value = float(stored_data.get("last_yield_value", 0.0))
-            except (ValueError, TypeError):
-                pass
-        
-        if self.solar_yield_day:
-            self.async_on_remove(
-                async_track_state_change_event(
-                    self.hass,
-                    self.solar_yield_day,
-                    self._yield_changed
-                )
-            )
-        await self.async_update()
+
+class StromkostenSolarYieldMonthly(StromkostenEntity):
+    _attr_name = "Solar Yield Monthly"
+    _attr_unique_id = "solar_yield_monthly"
+    _attr_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
+    _attr_state_class = SensorStateClass.TOTAL
+    _attr_icon = "mdi:calendar-month"
 
     @callback
-    def _yield_changed(self, event):
-        self.async_schedule_update_ha_state(force_refresh=True)
+    def _update_state(self) -> None:
+        self._state = round(self.coordinator.solar.totals[SOLAR_MONTH], 2)
 
-    async def async_update(self) -> None:
-        if not self.solar_yield_day:
-            self._state = 0.0
-            return
 
-        new_reset_date = self._get_yearly_start_date()
-        
-        if new_reset_date > self._last_reset:
-            self._accumulated = 0.0
-            self._last_yield_value = 0.0
-            self._last_reset = new_reset_date
-            await self._store.async_save({
-                "accumulated": self._accumulated,
-                "last_reset": self._last_reset.isoformat(),
-                "last_yield_value": self._last_yield_value
-            })
-
-        state = self.hass.states.get(self.solar_yield_day)
-        if state and state.state not in (STATE_UNKNOWN, None, "unavailable"):
-            try:
-                yield_value = float(state.state)
-                if yield_value < self._last_yield_value:
-                    self._accumulated += self._last_yield_value
-                    await self._store.async_save({
-                        "accumulated": self._accumulated,
-                        "last_reset": self._last_reset.isoformat(),
-                        "last_yield_value": 0.0
-                    })
-                self._last_yield_value = yield_value
-            except ValueError:
-                pass
-
-        self._state = round(self._accumulated + self._last_yield_value, 2)
+class StromkostenSolarYieldYearly(StromkostenEntity):
+    _attr_name = "Solar Yield Yearly"
+    _attr_unique_id = "solar_yield_yearly"
+    _attr_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
+    _attr_state_class = SensorStateClass.TOTAL
+    _attr_icon = "mdi:calendar-year"
+
+    @callback
+    def _update_state(self) -> None:
+        self._state = round(self.coordinator.solar.totals[SOLAR_YEAR], 2)
 
     @property
-    def state(self) -> str | None:
-        return self._state if self._state is not None else STATE_UNKNOWN
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        if self.coordinator.solar_units.invalid_units:
+            return {"invalid_units": dict(self.coordinator.solar_units.invalid_units)}
+        return None
 
 
 async def async_setup_entry(
@@ -609,23 +378,27 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up sensors from a config entry."""
-    config_data = hass.data.get(DOMAIN, {}).get(entry.entry_id, {})
-    
-    power_sensors = config_data.get(CONF_POWER_SENSORS, [])
-    solar_power = config_data.get(CONF_SOLAR_POWER)
-    solar_yield_day = config_data.get(CONF_SOLAR_YIELD_DAY)
-    yearly_start_day = config_data.get(CONF_YEARLY_START_DAY, 1)
-    yearly_start_month = config_data.get(CONF_YEARLY_START_MONTH, 1)
-    cost_per_kwh = config_data.get(CONF_COST_PER_KWH, 0.30)
-    
+    coordinator: StromkostenCoordinator = hass.data[DOMAIN][entry.entry_id]
+
     entities = [
-        StromkostenConsumptionDaily(hass, power_sensors),
-        StromkostenConsumptionMonthly(hass, power_sensors),
-        StromkostenConsumptionYearly(hass, power_sensors, yearly_start_day, yearly_start_month),
-        StromkostenConsumptionYearlyPrognosis(hass, power_sensors, yearly_start_day, yearly_start_month),
-        StromkostenCostYearly(hass, power_sensors, cost_per_kwh, yearly_start_day, yearly_start_month),
-        StromkostenCostYearlyPrognosis(hass, power_sensors, cost_per_kwh, yearly_start_day, yearly_start_month),
-        SolarYieldYearly(hass, solar_yield_day, yearly_start_day, yearly_start_month),
+        StromkostenConsumptionDaily(coordinator),
+        StromkostenConsumptionMonthly(coordinator),
+        StromkostenConsumptionYearly(coordinator),
+        StromkostenConsumptionYearlyPrognosis(coordinator),
+        StromkostenCostYearly(coordinator),
+        StromkostenCostYearlyPrognosis(coordinator),
+        StromkostenAdvancePayments(coordinator),
+        StromkostenBillingBalance(coordinator),
+        StromkostenBaseLoad(coordinator),
+        StromkostenBaseLoadYearlyConsumption(coordinator),
+        StromkostenBaseLoadYearlyCost(coordinator),
+        StromkostenConsumptionLastWeek(coordinator),
+        StromkostenConsumptionMonthLastYear(coordinator),
+        StromkostenConsumptionBillingYearLastYear(coordinator),
+        StromkostenRejectedSamples(coordinator),
+        StromkostenSolarYieldDaily(coordinator),
+        StromkostenSolarYieldMonthly(coordinator),
+        StromkostenSolarYieldYearly(coordinator),
     ]
-    
-    async_add_entities(entities)
\ No newline at end of file
+
+    async_add_entities(entities)
@@ -0,0 +1,123 @@
+"""Solar-Erträge für Tag, Monat und Abrechnungsjahr aus dem Tagesertrag-Zähler."""
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+
+SOLAR_DAY = "day"
+SOLAR_MONTH = "month"
+SOLAR_YEAR = "year"
+
+
+class SolarYieldTracker:
+    """Leitet aus einem täglich zurückgesetzten Ertragszähler Deltas ab und summiert sie pro Zeitraum.
+
+    Letzter Zählerstand und Zeitpunkt werden mitgespeichert. Ein Reset wird
+    erkannt, wenn der Zähler fällt. Beim ersten Zählerstand nach dem Start
+    gilt zusätzlich ein gestiegener Zähler als Reset, wenn seit dem
+    gespeicherten Wert ein neuer Tag begonnen hat (Reset während Home
+    Assistant aus war). Im laufenden Betrieb ist ein Anstieg nach Mitternacht
+    ein normales Delta, weil manche Wechselrichter erst später zurücksetzen.
+    Ertrag zwischen dem letzten Wert vor dem Herunterfahren und dem Reset
+    lässt sich nicht rekonstruieren.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        period_starts: dict[str, Callable[[datetime], datetime]],
+        on_close: Optional[Callable[[str, datetime, float], None]] = None,
+    ):
+        # Schlüssel des früheren Jahres-Sensors, damit dessen Stand übernommen wird
+        self.store = Store(hass, 1, f"{DOMAIN}_solar_yield_yearly")
+        self._period_starts = period_starts
+        self._on_close = on_close
+        self.totals: dict[str, float] = {period: 0.0 for period in period_starts}
+        self.last_resets: dict[str, Optional[datetime]] = {period: None for period in period_starts}
+        self.last_value: Optional[float] = None
+        self.last_time: Optional[datetime] = None
+        # Bis zum ersten Zählerstand nach dem Start: last_time stammt aus der Zeit vor dem Start
+        self._resumed = True
+
+    def restore(self, stored_data: Optional[dict[str, Any]]) -> None:
+        if not stored_data:
+            return
+        try:
+            if "last_yield_value" in stored_data:
+                # Format des früheren Jahres-Sensors: Summe abgeschlossener Tage + aktueller Zählerstand
+                self.last_value = float(stored_data.get("last_yield_value", 0.0))
+                self.totals[SOLAR_YEAR] = float(stored_data.get("accumulated", 0.0)) + self.last_value
+                last_reset = stored_data.get("last_reset")
+                if last_reset:
+                    self.last_resets[SOLAR_YEAR] = _parse(last_reset)
+                return
+
+            for period, (last_reset, total) in stored_data.get("periods", {}).items():
+                if period in self.totals:
+                    self.totals[period] = float(total)
+                    self.last_resets[period] = _parse(last_reset) if last_reset else None
+            last_value = stored_data.get("last_value")
+            self.last_value = float(last_value) if last_value is not None else None
+            last_time = stored_data.get("last_time")
+            self.last_time = _parse(last_time) if last_time else None
+        except (ValueError, TypeError, KeyError):
+            pass
+
+    def data_to_save(self) -> dict[str, Any]:
+        return {
+            "periods": {
+                period: [last_reset.isoformat() if last_reset else None, self.totals[period]]
+                for period, last_reset in self.last_resets.items()
+            },
+            "last_value": self.last_value,
+            "last_time": self.last_time.isoformat() if self.last_time else None,
+        }
+
+    def roll(self, now: datetime) -> bool:
+        """Schaltet die Zeiträume weiter (Ortszeit). Gibt True zurück, wenn einer abgeschlossen wurde."""
+        changed = False
+        for period, period_start in self._period_starts.items():
+            start = period_start(now)
+            last_reset = self.last_resets[period]
+            if last_reset is None or start > last_reset:
+                if last_reset is not None and self._on_close is not None:
+                    self._on_close(period, last_reset, self.totals[period])
+                self.totals[period] = 0.0
+                self.last_resets[period] = start
+                changed = True
+        return changed
+
+    def add(self, value: float, now: datetime) -> bool:
+        """Übernimmt einen Zählerstand (kWh, Ortszeit). Gibt True zurück, wenn sich etwas geändert hat."""
+        changed = self.roll(now)
+
+        last_value = self.last_value
+        # Ohne Zeitpunkt (Stand des früheren Jahres-Sensors) gilt der Wert als vom selben Tag
+        new_day = self.last_time is not None and now.date() > self.last_time.date()
+        missed_reset = self._resumed and new_day and last_value is not None and value > last_value
+        self._resumed = False
+        if last_value is None or value < last_value or missed_reset:
+            delta = value
+        else:
+            delta = value - last_value
+
+        if delta > 0:
+            for period in self.totals:
+                self.totals[period] += delta
+
+        # Der Zeitpunkt wird nur beim Tageswechsel gespeichert, er dient allein der Reset-Erkennung
+        changed = changed or value != last_value or new_day or self.last_time is None
+        self.last_value = value
+        self.last_time = now
+        return changed
+
+
+def _parse(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+    return dt_util.as_local(parsed)
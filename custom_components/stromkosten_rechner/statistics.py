@@ -0,0 +1,120 @@
+"""Langzeitstatistik-Import für den Stromkosten Rechner."""
+import logging
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Optional
+
+from homeassistant.const import UnitOfEnergy
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, STATISTIC_CONSUMPTION, STATISTIC_COST
+
+if TYPE_CHECKING:
+    from homeassistant.components.recorder.models import StatisticMetaData
+
+_LOGGER = logging.getLogger(__name__)
+
+# StatisticMetaData/StatisticData sind TypedDicts; der Recorder wird erst beim ersten Import einer Stunde geladen
+CONSUMPTION_METADATA: "StatisticMetaData" = {
+    "has_mean": False,
+    "has_sum": True,
+    "name": "Stromkosten Rechner Verbrauch",
+    "source": DOMAIN,
+    "statistic_id": STATISTIC_CONSUMPTION,
+    "unit_of_measurement": UnitOfEnergy.KILO_WATT_HOUR,
+}
+
+COST_METADATA: "StatisticMetaData" = {
+    "has_mean": False,
+    "has_sum": True,
+    "name": "Stromkosten Rechner Kosten",
+    "source": DOMAIN,
+    "statistic_id": STATISTIC_COST,
+    "unit_of_measurement": "EUR",
+}
+
+
+class HourlyStatistics:
+    """Sammelt exakte Stundensummen (kWh und €) und importiert sie als Langzeitstatistik.
+
+    Die Energie kommt bereits an Stundengrenzen aufgeteilt vom Coordinator,
+    daher wird pro abgeschlossener Stunde genau eine Zeile geschrieben.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self.store = Store(hass, 1, f"{DOMAIN}_statistics")
+        self._hour_start: Optional[datetime] = None
+        self._hour_kwh = 0.0
+        self._hour_cost = 0.0
+        self._sum_kwh = 0.0
+        self._sum_cost = 0.0
+
+    def restore(self, stored_data: Optional[dict[str, Any]]) -> None:
+        """Stellt die laufenden Summen aus dem Store wieder her."""
+        if not stored_data:
+            return
+        try:
+            self._sum_kwh = float(stored_data.get("sum_kwh", 0.0))
+            self._sum_cost = float(stored_data.get("sum_cost", 0.0))
+            self._hour_kwh = float(stored_data.get("hour_kwh", 0.0))
+            self._hour_cost = float(stored_data.get("hour_cost", 0.0))
+            hour_start = stored_data.get("hour_start")
+            self._hour_start = dt_util.parse_datetime(hour_start) if hour_start else None
+        except (ValueError, TypeError):
+            pass
+
+    def data_to_save(self) -> dict[str, Any]:
+        return {
+            "sum_kwh": self._sum_kwh,
+            "sum_cost": self._sum_cost,
+            "hour_start": self._hour_start.isoformat() if self._hour_start else None,
+            "hour_kwh": self._hour_kwh,
+            "hour_cost": self._hour_cost,
+        }
+
+    def add(self, start: datetime, energy_kwh: float, cost: float) -> bool:
+        """Addiert ein Energie-Segment (Start in UTC). Gibt True zurück, wenn sich etwas geändert hat."""
+        hour_start = start.replace(minute=0, second=0, microsecond=0)
+        changed = False
+
+        if self._hour_start is None:
+            self._hour_start = hour_start
+            changed = True
+        elif hour_start > self._hour_start:
+            self._flush()
+            self._hour_start = hour_start
+            changed = True
+
+        if energy_kwh > 0:
+            self._hour_kwh += energy_kwh
+            self._hour_cost += cost
+            changed = True
+
+        return changed
+
+    def _flush(self) -> None:
+        """Schreibt die abgeschlossene Stunde in die Langzeitstatistik."""
+        from homeassistant.components.recorder.statistics import async_add_external_statistics
+
+        self._sum_kwh += self._hour_kwh
+        self._sum_cost += self._hour_cost
+
+        async_add_external_statistics(
+            self.hass,
+            CONSUMPTION_METADATA,
+            [{"start": self._hour_start, "state": self._hour_kwh, "sum": self._sum_kwh}],
+        )
+        async_add_external_statistics(
+            self.hass,
+            COST_METADATA,
+            [{"start": self._hour_start, "state": self._hour_cost, "sum": self._sum_cost}],
+        )
+        _LOGGER.debug(
+            "Stundenstatistik %s importiert: %.3f kWh, %.2f €",
+            self._hour_start, self._hour_kwh, self._hour_cost
+        )
+
+        self._hour_kwh = 0.0
+        self._hour_cost = 0.0
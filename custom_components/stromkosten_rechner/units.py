@@ -0,0 +1,58 @@
+"""Einheiten-Normalisierung der Eingangssensoren mit gecachten Umrechnungsfaktoren."""
+import logging
+from typing import Any, Optional
+
+from homeassistant.const import ATTR_UNIT_OF_MEASUREMENT, UnitOfEnergy, UnitOfPower
+from homeassistant.core import State
+
+_LOGGER = logging.getLogger(__name__)
+
+# Faktoren in die intern verwendete Einheit (W bzw. kWh)
+POWER_FACTORS = {
+    UnitOfPower.WATT: 1.0,
+    UnitOfPower.KILO_WATT: 1000.0,
+    "MW": 1000000.0,
+}
+
+ENERGY_FACTORS = {
+    UnitOfEnergy.WATT_HOUR: 0.001,
+    UnitOfEnergy.KILO_WATT_HOUR: 1.0,
+    UnitOfEnergy.MEGA_WATT_HOUR: 1000.0,
+}
+
+
+class UnitNormalizer:
+    """Liefert pro Entity den Faktor in die Zieleinheit.
+
+    Die `unit_of_measurement` wird nur gelesen, wenn sich die Attribute des
+    Zustands geändert haben: Home Assistant übernimmt bei unveränderten
+    Attributen dasselbe Objekt, daher genügt ein Identitätsvergleich.
+    """
+
+    def __init__(self, factors: dict[str, float], target_unit: str):
+        self._factors = factors
+        self._target_unit = target_unit
+        self._cache: dict[str, tuple[Any, Optional[float]]] = {}
+        self.invalid_units: dict[str, Optional[str]] = {}
+
+    def factor(self, state: State) -> Optional[float]:
+        """Umrechnungsfaktor oder None, wenn die Einheit nicht passt"""
+        cached = self._cache.get(state.entity_id)
+        if cached is not None and cached[0] is state.attributes:
+            return cached[1]
+
+        unit = state.attributes.get(ATTR_UNIT_OF_MEASUREMENT)
+        factor = self._factors.get(unit)
+
+        if factor is None:
+            if self.invalid_units.get(state.entity_id, False) != unit:
+                _LOGGER.warning(
+                    "%s hat die Einheit %r, erwartet wird eine Einheit umrechenbar in %s; Messwerte werden ignoriert",
+                    state.entity_id, unit, self._target_unit
+                )
+            self.invalid_units[state.entity_id] = unit
+        else:
+            self.invalid_units.pop(state.entity_id, None)
+
+        self._cache[state.entity_id] = (state.attributes, factor)
+        return factor